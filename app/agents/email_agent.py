@@ -4,69 +4,113 @@ from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 import os
 
+from app.records import AnalysisSource, Category, ScanResult
+from app.metrics import LLM_CALLS, LLM_SECONDS, LLM_TOKENS
+from app.agents.token_budget import (
+    EMAIL_TOKEN_FLOOR, ScanBudget, classification_cache, estimate_tokens, trim_to_tokens
+)
+
 load_dotenv()
 api_key = os.getenv("GROQ_API_KEY")
 
+MODEL_NAME = "llama-3.1-8b-instant"
+# the answer is a one-line JSON object; cap it so a chatty reply cannot eat the budget
+LLM_MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "96"))
+
 # Initialize the LLM only once
 llm = ChatGroq(
     groq_api_key=api_key,
-    model = "llama-3.1-8b-instant"
+    model = MODEL_NAME,
+    max_tokens = LLM_MAX_OUTPUT_TOKENS
 )
 
-# Define keywords to filter important mails
-IMPORTANT_KEYWORDS = [
-    "exam", "assignment", "deadline", "submission", 
-    "internship", "interview", "viva", "results", "schedule", "project"
-]
+# Kept short on purpose: it is paid for on every classified email
+PROMPT_TEMPLATE = """Classify this student email as IMPORTANT (action needed soon), POTENTIALLY_IMPORTANT (useful, not urgent) or IRRELEVANT (not academic), and summarize it.
+Subject: {subject}
+Snippet: {snippet}
+Reply with JSON only: {{"category": "<category>", "summary": "<short summary>"}}"""
+
+prompt = PromptTemplate.from_template(PROMPT_TEMPLATE)
+PROMPT_OVERHEAD_TOKENS = estimate_tokens(prompt.format(subject="", snippet=""))
 
-def classify_emails(gmail_client, max_messages=40):
-    """Fetch emails, filter relevant ones, and analyze only those."""
-    email_texts = gmail_client.fetch_messages(max_results=max_messages)
+KEYWORD_ONLY_ANALYSIS = "Keyword match only (LLM token budget exhausted)."
 
-    prompt_template = """You are an academic assistant AI.
-Summarize this student-related email and classify it as one of:
-- IMPORTANT (if action needed soon)
-- POTENTIALLY_IMPORTANT (if useful but not urgent)
-- IRRELEVANT (if unrelated to academics)
+def response_token_usage(response):
+    """(prompt, completion) tokens reported by the provider, or None if absent."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    # older langchain-groq only fills response_metadata
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if token_usage:
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+    return None
 
-Email content:
-Subject: {subject}
-Snippet: {snippet}
+def invoke_llm(prompt_text):
+    """Call the LLM, recording latency, outcome and provider-reported token usage."""
+    try:
+        with LLM_SECONDS.labels(model=MODEL_NAME).time():
+            response = llm.invoke(prompt_text)
+    except Exception:
+        LLM_CALLS.labels(model=MODEL_NAME, outcome="error").inc()
+        raise
+    LLM_CALLS.labels(model=MODEL_NAME, outcome="ok").inc()
+    usage = response_token_usage(response)
+    if usage:
+        LLM_TOKENS.labels(model=MODEL_NAME, kind="prompt").inc(usage[0])
+        LLM_TOKENS.labels(model=MODEL_NAME, kind="completion").inc(usage[1])
+    return response
+
+def analyze_email(email, budget: ScanBudget, pending: int = 1) -> ScanResult:
+    """
+    Classify one keyword-matched email within `budget`.
+    `pending` is how many matched emails (including this one) are still to go in the
+    scan; the prompt is trimmed so later emails can still be classified, down to
+    EMAIL_TOKEN_FLOOR. Answers are cached by content, and once the budget cannot
+    cover even a floor-sized prompt the email is returned as a keyword-only match
+    without calling the LLM.
+    """
+    cache_key = classification_cache.key(email.subject, email.snippet)
+    hit = classification_cache.get(cache_key)
+    if hit is not None:
+        analysis, tokens = hit
+        budget.note_cached(tokens)
+        return ScanResult(email.subject, email.snippet, analysis, Category.from_analysis(analysis),
+                          AnalysisSource.CACHE)
+
+    subject = email.subject.lower()
+    snippet = email.snippet.lower()
+    untrimmed = estimate_tokens(subject) + estimate_tokens(snippet)
+
+    allowance = budget.email_allowance(PROMPT_OVERHEAD_TOKENS + LLM_MAX_OUTPUT_TOKENS, pending)
+    if allowance < EMAIL_TOKEN_FLOOR:
+        budget.note_saved(PROMPT_OVERHEAD_TOKENS + untrimmed + LLM_MAX_OUTPUT_TOKENS, degraded=True)
+        return ScanResult(email.subject, email.snippet, KEYWORD_ONLY_ANALYSIS, Category.POTENTIALLY_IMPORTANT,
+                          AnalysisSource.KEYWORD_ONLY)
+
+    # the subject carries most of the signal; the snippet gets whatever is left
+    subject = trim_to_tokens(subject, max(allowance // 2, allowance - estimate_tokens(snippet)))
+    snippet = trim_to_tokens(snippet, allowance - estimate_tokens(subject))
+    full_prompt = prompt.format(subject=subject, snippet=snippet)
+
+    reserved = estimate_tokens(full_prompt) + LLM_MAX_OUTPUT_TOKENS
+    if not budget.reserve(reserved):
+        budget.note_saved(reserved, degraded=True)
+        return ScanResult(email.subject, email.snippet, KEYWORD_ONLY_ANALYSIS, Category.POTENTIALLY_IMPORTANT,
+                          AnalysisSource.KEYWORD_ONLY)
+    budget.note_saved(max(0, untrimmed - estimate_tokens(subject) - estimate_tokens(snippet)))
+
+    try:
+        response = invoke_llm(full_prompt)
+    except Exception as e:
+        budget.settle(reserved, 0)
+        return ScanResult(email.subject, email.snippet, f"Error analyzing email: {e}", Category.ERROR,
+                          AnalysisSource.ERROR)
+
+    usage = response_token_usage(response)
+    used = sum(usage) if usage else None
+    budget.settle(reserved, used)
 
-Return JSON format:
-{{
-  "category": "<category>",
-  "summary": "<short summary>"
-}}"""
-
-    prompt = PromptTemplate.from_template(prompt_template)
-    results = []
-
-    for email in email_texts:
-        subject = email["subject"].lower()
-        snippet = email["snippet"].lower()
-
-        # ✅ Check if the email contains relevant keywords
-        if any(word in subject or word in snippet for word in IMPORTANT_KEYWORDS):
-            full_prompt = prompt.format(subject=subject, snippet=snippet)
-
-            try:
-                response = llm.invoke(full_prompt)
-                analysis = response.content
-            except Exception as e:
-                analysis = f"Error analyzing email: {e}"
-
-            results.append({
-                "subject": email["subject"],
-                "snippet": email["snippet"],
-                "analysis": analysis
-            })
-        else:
-            # Skip irrelevant emails (no API call)
-            results.append({
-                "subject": email["subject"],
-                "snippet": email["snippet"],
-                "analysis": "Skipped (no relevant keywords found)."
-            })
-
-    return results
+    analysis = response.content
+    classification_cache.put(cache_key, analysis, used if used is not None else reserved)
+    return ScanResult(email.subject, email.snippet, analysis, Category.from_analysis(analysis))
@@ -0,0 +1,176 @@
+# app/agents/token_budget.py
+"""
+Token accounting for LLM email classification.
+
+- `estimate_tokens` / `trim_to_tokens`: local, dependency-free estimates (~4 chars
+  per token for English mail), used before anything is sent.
+- `DailyTokenLedger`: process-wide per-day usage, shared by all scans.
+- `ScanBudget`: one per scan; reserves an estimate before each call, settles it
+  against the provider-reported usage afterwards, and refuses calls once either
+  the scan or the day limit would be exceeded.
+- `ClassificationCache`: remembers answers for identical (subject, snippet) so
+  re-scanning the same inbox does not pay for the same emails twice.
+"""
+import datetime
+import hashlib
+import math
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.lru import LRUCache
+
+CHARS_PER_TOKEN = 4
+SCAN_TOKEN_BUDGET = int(os.environ.get("LLM_SCAN_TOKEN_BUDGET", "20000"))
+DAILY_TOKEN_BUDGET = int(os.environ.get("LLM_DAILY_TOKEN_BUDGET", "400000"))
+# upper bound for the subject + snippet part of one prompt
+EMAIL_TOKEN_CAP = int(os.environ.get("LLM_EMAIL_TOKEN_CAP", "160"))
+# below this an email is not worth classifying; degrade to keyword-only instead
+EMAIL_TOKEN_FLOOR = int(os.environ.get("LLM_EMAIL_TOKEN_FLOOR", "24"))
+CACHE_SIZE = int(os.environ.get("LLM_CLASSIFICATION_CACHE_SIZE", "5000"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for `text`; errs slightly high so budgets are not overrun."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to about `max_tokens`, at a word boundary when one is close."""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    if space > max_chars * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+class DailyTokenLedger:
+    """Tokens used today, across all scans in this process."""
+
+    def __init__(self, limit: int = DAILY_TOKEN_BUDGET):
+        self.limit = limit
+        self._day = datetime.date.today()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _roll(self):
+        today = datetime.date.today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll()
+            return max(0, self.limit - self._used)
+
+    def try_add(self, tokens: int) -> bool:
+        with self._lock:
+            self._roll()
+            if self._used + tokens > self.limit:
+                return False
+            self._used += tokens
+            return True
+
+    def adjust(self, delta: int):
+        with self._lock:
+            self._roll()
+            self._used = max(0, self._used + delta)
+
+
+class ScanBudget:
+    """Per-scan token budget plus counters reported in the scan stats."""
+
+    def __init__(self, limit: int = None, ledger: DailyTokenLedger = None,
+                 email_cap: int = EMAIL_TOKEN_CAP):
+        self.limit = limit if limit is not None else SCAN_TOKEN_BUDGET
+        self.ledger = ledger or daily_ledger
+        self.email_cap = email_cap
+        self.reserved = 0
+        self.spent = 0
+        self.cached = 0
+        self.saved = 0
+        self.degraded = 0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> int:
+        with self._lock:
+            return max(0, self.limit - self.reserved)
+
+    def email_allowance(self, overhead: int, pending: int, floor: int = EMAIL_TOKEN_FLOOR) -> int:
+        """
+        Tokens the subject + snippet of the next email may use, out of `pending`
+        emails (this one included) still to go, each costing `overhead` on top.
+
+        Emails are served in order: the next one gets up to the per-email cap,
+        keeping back only the floor-sized cost of as many later emails as the
+        remaining budget can still afford. A tight budget therefore trims emails
+        toward the floor, and only the tail of the scan drops below it.
+        """
+        remaining = min(self.remaining(), self.ledger.remaining())
+        affordable = remaining // (overhead + floor)
+        held_back = max(0, min(pending, affordable) - 1) * (overhead + floor)
+        return max(0, min(self.email_cap, remaining - held_back - overhead))
+
+    def reserve(self, tokens: int) -> bool:
+        with self._lock:
+            if self.reserved + tokens > self.limit:
+                return False
+            if not self.ledger.try_add(tokens):
+                return False
+            self.reserved += tokens
+            return True
+
+    def settle(self, reserved: int, actual: Optional[int]):
+        """Replace a reservation with the provider-reported usage (if any)."""
+        used = reserved if actual is None else actual
+        with self._lock:
+            self.reserved += used - reserved
+            self.spent += used
+        self.ledger.adjust(used - reserved)
+
+    def note_cached(self, tokens: int):
+        with self._lock:
+            self.cached += tokens
+
+    def note_saved(self, tokens: int, degraded: bool = False):
+        with self._lock:
+            self.saved += tokens
+            if degraded:
+                self.degraded += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "tokens_spent": self.spent,
+                "tokens_cached": self.cached,
+                "tokens_saved": self.saved,
+                "llm_degraded": self.degraded,
+                "tokens_day_remaining": self.ledger.remaining(),
+            }
+
+
+class ClassificationCache(LRUCache):
+    """LRU of (subject, snippet) -> (analysis, tokens it cost)."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        super().__init__(maxsize)
+
+    @staticmethod
+    def key(subject: str, snippet: str) -> str:
+        return hashlib.sha1(f"{subject}\x00{snippet}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        return super().get(key)
+
+    def put(self, key: str, analysis: str, tokens: int):
+        super().put(key, (analysis, tokens))
+
+
+daily_ledger = DailyTokenLedger()
+classification_cache = ClassificationCache()
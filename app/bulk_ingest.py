@@ -0,0 +1,211 @@
+# app/bulk_ingest.py
+"""
+Bulk timetable ingestion: parse a directory (or glob) of PDFs across a process pool
+and stream one JSON line per file to an output file as each parse finishes.
+
+    python -m app.main --bulk ./timetables --out timetables.jsonl --workers 8
+
+Failures and timeouts are isolated per file and recorded in the output. A worker
+that dies outright (segfault, OOM kill) breaks the whole pool; the files still in
+flight are resubmitted to a fresh pool, and a file caught in `MAX_SHARED_CRASHES`
+broken pools is retried alone, so only the file that kills its worker is recorded
+as crashed. Files whose content hash already has an "ok" line for the same engine
+in the output are skipped on re-runs.
+"""
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Set, Tuple
+
+ENGINES = ("pymupdf", "pdfplumber")
+# broken pools a file may be in flight in before it is retried in a pool of its own
+MAX_SHARED_CRASHES = 2
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+# set by the alarm handler; parsers such as pdfminer re-wrap exceptions raised inside them
+_timed_out = False
+
+
+def _on_alarm(signum, frame):
+    global _timed_out
+    _timed_out = True
+    raise ParseTimeout()
+
+
+def discover_files(target: str) -> List[str]:
+    """All PDFs under a directory (recursively), or the files matching a glob."""
+    if os.path.isdir(target):
+        paths = glob.glob(os.path.join(target, "**", "*.pdf"), recursive=True)
+        paths += glob.glob(os.path.join(target, "**", "*.PDF"), recursive=True)
+    else:
+        paths = glob.glob(target, recursive=True)
+    return sorted(set(p for p in paths if os.path.isfile(p)))
+
+
+def load_done(out_path: str) -> Set[Tuple[str, str]]:
+    """(content hash, engine) pairs already ingested successfully into `out_path`."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # tolerate a truncated last line from an interrupted run
+            if rec.get("status") == "ok" and rec.get("sha256"):
+                done.add((rec["sha256"], rec.get("engine")))
+    return done
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def parse_file(path: str, sha256: str, engine: str, timeout: float) -> Dict:
+    """Worker entry point: parse one file and return its JSONL record."""
+    global _timed_out
+    _timed_out = False
+    start = time.perf_counter()
+    rec = {"path": path, "sha256": sha256, "engine": engine, "bytes": os.path.getsize(path)}
+
+    # the alarm interrupts a runaway parse inside this worker without killing the pool
+    old_handler = signal.signal(signal.SIGALRM, _on_alarm)
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # parse_pdf_timetable prints its debug dump; keep it out of the CLI output
+        with contextlib.redirect_stdout(io.StringIO()):
+            if engine == "pdfplumber":
+                from app.timetable_parser import parse_pdf_timetable
+                from app.records import events_to_json
+                rec["result"] = {"events": events_to_json(parse_pdf_timetable(path))}
+            else:
+                from app.timetable_parser_pdf import parse_timetable_pdf_bytes
+                from app.records import timetable_text_to_json
+                with open(path, "rb") as f:
+                    rec["result"] = timetable_text_to_json(parse_timetable_pdf_bytes(f.read()))
+        rec["status"] = "ok"
+    except Exception as e:
+        if isinstance(e, ParseTimeout) or _timed_out:
+            rec["status"] = "timeout"
+            rec["error"] = f"parse exceeded {timeout}s"
+        else:
+            rec["status"] = "error"
+            rec["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+
+    rec["elapsed_s"] = round(time.perf_counter() - start, 4)
+    return rec
+
+
+def run_bulk(target: str, out_path: str, workers: int = None, timeout: float = 120.0,
+             engine: str = "pymupdf") -> Dict:
+    """Parse every file under `target`, appending records to `out_path`. Returns run stats."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}; expected one of {ENGINES}")
+
+    files = discover_files(target)
+    done = load_done(out_path)
+    stats = {"files": len(files), "skipped": 0, "ok": 0, "error": 0, "timeout": 0, "bytes": 0,
+             "pool_restarts": 0}
+
+    pending = []
+    seen = set()
+    for path in files:
+        sha = file_sha256(path)
+        # identical copies within one drop are parsed once too
+        if (sha, engine) in done or sha in seen:
+            stats["skipped"] += 1
+            continue
+        seen.add(sha)
+        pending.append((path, sha))
+
+    start = time.perf_counter()
+    with open(out_path, "a", encoding="utf-8") as out:
+        def record(rec: Dict):
+            stats[rec["status"]] += 1
+            stats["bytes"] += rec.get("bytes", 0)
+            out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            out.flush()
+            _print_progress(rec)
+
+        crashes: Dict[str, int] = {}
+        while pending:
+            shared = [item for item in pending if crashes.get(item[1], 0) < MAX_SHARED_CRASHES]
+            alone = [item for item in pending if crashes.get(item[1], 0) >= MAX_SHARED_CRASHES]
+            pending = []
+            if shared:
+                pending = _run_pool(shared, workers, engine, timeout, record)
+            for item in alone:
+                # one worker, one file: if the pool breaks now, this file is the cause
+                for path, sha in _run_pool([item], 1, engine, timeout, record):
+                    record({"path": path, "sha256": sha, "engine": engine, "status": "error",
+                            "error": "worker crashed while parsing this file"})
+            if pending:
+                stats["pool_restarts"] += 1
+                for _, sha in pending:
+                    crashes[sha] = crashes.get(sha, 0) + 1
+
+    elapsed = time.perf_counter() - start
+    parsed = stats["ok"] + stats["error"] + stats["timeout"]
+    stats["elapsed_s"] = round(elapsed, 3)
+    stats["files_per_s"] = round(parsed / elapsed, 2) if elapsed > 0 else 0.0
+    stats["mb_per_s"] = round(stats["bytes"] / (1024 * 1024) / elapsed, 2) if elapsed > 0 else 0.0
+    return stats
+
+
+def _run_pool(items: List[Tuple[str, str]], workers: int, engine: str, timeout: float,
+              record: Callable[[Dict], None]) -> List[Tuple[str, str]]:
+    """Parse `items` in a fresh pool, recording each result; returns the items left
+    unfinished because a worker died and broke the pool."""
+    unfinished = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for i, (path, sha) in enumerate(items):
+            try:
+                futures[pool.submit(parse_file, path, sha, engine, timeout)] = (path, sha)
+            except BrokenProcessPool:
+                unfinished.extend(items[i:])
+                break
+        for fut in as_completed(futures):
+            try:
+                rec = fut.result()
+            except BrokenProcessPool:
+                unfinished.append(futures[fut])
+                continue
+            record(rec)
+    return unfinished
+
+
+def _print_progress(rec: Dict):
+    if rec["status"] == "ok":
+        res = rec["result"]
+        n = len(res.get("events", [])) or len(res.get("exams", [])) + len(res.get("holidays", []))
+        print(f"  ✅ {rec['path']} ({n} entries, {rec['elapsed_s']}s)")
+    else:
+        print(f"  ❌ {rec['path']} [{rec['status']}] {rec.get('error', '')}")
+
+
+def print_stats(stats: Dict):
+    print("\n📦 Bulk ingestion summary:")
+    for key in ("files", "skipped", "ok", "error", "timeout", "pool_restarts", "elapsed_s", "files_per_s",
+                "mb_per_s"):
+        print(f"  {key:<12} {stats[key]}")
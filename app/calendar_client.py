@@ -1,10 +1,14 @@
 # app/calendar_client.py
 import os
 import json
+import threading
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, timedelta
+from typing import List, Dict, Union
+
+from app import google_async
+from app.google_async import AsyncGoogleSession, AsyncCalendarClient, run_sync
+from app.records import EventType, TimetableEvent
 
 TOKEN_PATH = os.environ.get("GOOGLE_CALENDAR_TOKEN_PATH", "./tokens/calendar_token.json")
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
@@ -17,31 +21,59 @@ def load_credentials():
     creds = Credentials.from_authorized_user_info(data, scopes=SCOPES)
     return creds
 
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_calendar_client(calendar_id="primary", base_url=None):
+    """Cached CalendarClient for this token file, `calendar_id` and API base URL."""
+    key = (TOKEN_PATH, calendar_id, base_url or google_async.GOOGLE_API_BASE_URL)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = CalendarClient(calendar_id=calendar_id, base_url=key[2])
+        return client
+
 class CalendarClient:
-    def __init__(self, calendar_id="primary"):
+    def __init__(self, calendar_id="primary", base_url=None):
         self.creds = load_credentials()
-        self.service = build("calendar", "v3", credentials=self.creds)
+        self.aio = AsyncCalendarClient(AsyncGoogleSession(self.creds, base_url=base_url), calendar_id=calendar_id)
         self.calendar_id = calendar_id
 
-    def create_all_day_event(self, date_iso: str, summary: str, description: str = "", reminders: List[Dict] = None):
-        """
-        Create an all-day event on `date_iso` (YYYY-MM-DD).
-        For all-day events, set end date to next day (Google expects end exclusive).
-        `reminders` example: [{"method":"popup","minutes":60}, {"method":"email","minutes":1440}]
-        """
-        start_date = date_iso
-        # end is exclusive for full-day events
-        dt = datetime.strptime(date_iso, "%Y-%m-%d")
-        end_date = (dt + timedelta(days=1)).strftime("%Y-%m-%d")
+    def list_events(self, time_min: str = None, time_max: str = None, max_results: int = 250):
+        """List events, optionally bounded by RFC3339 `time_min` / `time_max`."""
+        return run_sync(self.aio.list_events(time_min=time_min, time_max=time_max, max_results=max_results))
 
-        event = {
+    def patch_event(self, event_id: str, fields: Dict):
+        """Patch only the given fields of an existing event."""
+        return run_sync(self.aio.patch_event(event_id, fields))
+
+    def _all_day_body(self, day: date, summary: str, description: str = "", reminders: List[Dict] = None,
+                      last_day: date = None) -> Dict:
+        # end is exclusive for full-day events; multi-day events span day..last_day inclusive
+        end_day = (last_day or day) + timedelta(days=1)
+
+        return {
             "summary": summary,
             "description": description,
-            "start": {"date": start_date},
-            "end": {"date": end_date},
+            "start": {"date": day.isoformat()},
+            "end": {"date": end_day.isoformat()},
             "reminders": {"useDefault": False, "overrides": reminders or [{"method": "popup", "minutes": 60}]}
         }
-        created = self.service.events().insert(calendarId=self.calendar_id, body=event).execute()
+
+    def create_all_day_event(self, date_iso: Union[str, date], summary: str, description: str = "", reminders: List[Dict] = None,
+                             end_date_iso: Union[str, date] = None):
+        """
+        Create an all-day event on `date_iso` (YYYY-MM-DD string or a `date`).
+        Pass `end_date_iso` (inclusive) for a single multi-day event, e.g. a week-long break.
+        For all-day events, set end date to next day (Google expects end exclusive).
+        `reminders` example: [{"method":"popup","minutes":60}, {"method":"email","minutes":1440}]
+        """
+        day = date.fromisoformat(date_iso) if isinstance(date_iso, str) else date_iso
+        last_day = date.fromisoformat(end_date_iso) if isinstance(end_date_iso, str) else end_date_iso
+        event = self._all_day_body(day, summary, description, reminders, last_day=last_day)
+        created = run_sync(self.aio.insert_event(event))
         return created
 
     def create_timed_event(self, start_iso: str, end_iso: str, summary: str, description: str = "", timezone: str = "UTC", reminders: List[Dict] = None):
@@ -55,30 +87,38 @@ class CalendarClient:
             "end": {"dateTime": end_iso, "timeZone": timezone},
             "reminders": {"useDefault": False, "overrides": reminders or [{"method": "popup", "minutes": 60}]}
         }
-        created = self.service.events().insert(calendarId=self.calendar_id, body=event).execute()
+        created = run_sync(self.aio.insert_event(event))
         return created
 
-    def create_events_from_timetable(self, parsed_events: List[Dict], reminders_minutes_before=60):
+    def create_events_from_timetable(self, parsed_events: List[TimetableEvent], reminders_minutes_before=60):
         """
-        parsed_events: list of dicts with keys: { "date": "YYYY-MM-DD", "event": "...", "type": "Exam"/"Holiday"/"Other" }
-        Returns list of created event resources returned by API.
+        parsed_events: list of TimetableEvent records (use TimetableEvent.from_dict for posted JSON).
+        Events without a date are skipped; date ranges become one multi-day event each.
+        Returns (created, failed): the event resources returned by the API, and
+        (event, error) pairs for the inserts that still failed after retries.
         """
-        created = []
         # default reminders: popup X minutes before and email 1 day before
         reminders = [
             {"method": "popup", "minutes": reminders_minutes_before},
             {"method": "email", "minutes": 24 * 60}  # 1 day before via email
         ]
+        bodies, dated = [], []
         for e in parsed_events:
-            date = e.get("date")
-            title = e.get("event") or "Event"
+            if e.day is None:
+                continue
+            title = e.title or "Event"
             # you can customize summary based on type
-            if e.get("type") == "Exam":
+            if e.type is EventType.EXAM:
                 summary = f"Exam: {title}"
             else:
                 summary = title
 
-            # create all-day event
-            created_event = self.create_all_day_event(date_iso=date, summary=summary, description=title, reminders=reminders)
-            created.append(created_event)
-        return created
+            bodies.append(self._all_day_body(e.date, summary=summary, description=title, reminders=reminders,
+                                             last_day=e.end_date))
+            dated.append(e)
+
+        # inserts run concurrently over the pooled connection, results keep input order
+        results = run_sync(self.aio.insert_events(bodies))
+        created = [r for r in results if not isinstance(r, Exception)]
+        failed = [(e, r) for e, r in zip(dated, results) if isinstance(r, Exception)]
+        return created, failed
@@ -1,21 +1,53 @@
 import os
 import base64
 import json
+import threading
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from email.mime.text import MIMEText
+from email.utils import parsedate_to_datetime
+
+from app import google_async
+from app.google_async import AsyncGoogleSession, AsyncGmailClient, run_sync
+from app.records import EmailRecord
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _received_at(msg_data, headers) -> float:
+    """Unix time the message arrived: Gmail's internalDate (ms), else the Date header."""
+    if msg_data.get("internalDate"):
+        return int(msg_data["internalDate"]) / 1000.0
+    try:
+        return parsedate_to_datetime(headers["Date"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _token_path(token_path=None):
+    return token_path or os.environ.get("GOOGLE_TOKEN_PATH", "./tokens/token.json")
+
+
+def get_gmail_client(token_path=None, base_url=None):
+    """Cached GmailClient for this token file and API base URL."""
+    key = (_token_path(token_path), base_url or google_async.GOOGLE_API_BASE_URL)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = GmailClient(token_path=key[0], base_url=key[1])
+        return client
 
 
 class GmailClient:
-    def __init__(self, token_path=None, credentials_path=None):
-        token_path = token_path or os.environ.get("GOOGLE_TOKEN_PATH", "./tokens/token.json")
+    def __init__(self, token_path=None, credentials_path=None, base_url=None):
+        token_path = _token_path(token_path)
         credentials_path = credentials_path or os.environ.get("GOOGLE_CREDENTIALS_PATH", "./credentials/credentials.json")
 
         with open(token_path, "r") as f:
             token_data = json.load(f)
 
         self.creds = Credentials.from_authorized_user_info(token_data)
-        self.service = build("gmail", "v1", credentials=self.creds)
+        self.aio = AsyncGmailClient(AsyncGoogleSession(self.creds, base_url=base_url))
 
     def send_message(self, to_email, subject, body_text, from_email=None):
         """Send an email using Gmail API."""
@@ -25,49 +57,30 @@ class GmailClient:
         message["subject"] = subject
         raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
 
-        return self.service.users().messages().send(
-            userId="me", body={"raw": raw}
-        ).execute()
+        return run_sync(self.aio.send_message(raw))
 
     def list_messages(self, query=None, max_results=50):
         """List message IDs from the user's mailbox."""
-        res = self.service.users().messages().list(
-            userId="me", q=query, maxResults=max_results
-        ).execute()
-        return res.get("messages", [])
+        return run_sync(self.aio.list_messages(query=query, max_results=max_results))
 
     def get_message(self, msg_id):
         """Retrieve a specific message by ID."""
-        msg = self.service.users().messages().get(
-            userId="me", id=msg_id, format="full"
-        ).execute()
+        msg = run_sync(self.aio.get_message(msg_id, format="full"))
         headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
         snippet = msg.get("snippet", "")
         return {"id": msg_id, "headers": headers, "snippet": snippet}
 
     def fetch_messages(self, max_results=40):
-        """Fetch recent emails and return a list of dicts (subject + snippet)."""
-        results = self.service.users().messages().list(
-            userId="me",
-            maxResults=max_results
-        ).execute()
-
-        messages = results.get("messages", [])
+        """Fetch recent emails and return a list of EmailRecord (id, subject, snippet, sender, timestamp)."""
+        messages = run_sync(self.aio.fetch_messages(max_results=max_results))
         email_texts = []
 
-        for msg in messages:
-            msg_data = self.service.users().messages().get(
-                userId="me", id=msg["id"]
-            ).execute()
-
-            headers = msg_data.get("payload", {}).get("headers", [])
-            subject = next((h["value"] for h in headers if h["name"] == "Subject"), "(No Subject)")
+        for msg_data in messages:
+            headers = {h["name"]: h["value"] for h in msg_data.get("payload", {}).get("headers", [])}
+            subject = headers.get("Subject", "(No Subject)")
             snippet = msg_data.get("snippet", "")
 
-            # ✅ Return dict, not string
-            email_texts.append({
-                "subject": subject,
-                "snippet": snippet
-            })
+            email_texts.append(EmailRecord(subject=subject, snippet=snippet, id=msg_data.get("id", ""),
+                                           sender=headers.get("From", ""), timestamp=_received_at(msg_data, headers)))
 
         return email_texts
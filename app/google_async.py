@@ -0,0 +1,269 @@
+# app/google_async.py
+"""
+asyncio-native client layer for the Gmail and Calendar REST endpoints the app uses.
+
+All requests go through one pooled ``httpx.AsyncClient`` per session, so keep-alive
+connections are reused and a single event loop can keep hundreds of Google calls
+in flight. ``GOOGLE_API_BASE_URL`` can point the clients at a local stub server.
+
+429 and 5xx answers and transport errors (timeouts, refused or dropped
+connections) are retried up to ``GOOGLE_API_MAX_RETRIES`` times with exponential
+backoff and full jitter, waiting at least as long as a Retry-After header asks
+(up to ``GOOGLE_API_RETRY_AFTER_MAX`` seconds). A POST is only retried on errors
+raised before it reached the server, so an insert or send is never duplicated.
+``fetch_messages`` drops messages that still fail and ``insert_events`` returns
+one result per event, instead of failing the whole batch.
+
+The synchronous ``GmailClient`` / ``CalendarClient`` wrap these clients through
+``run_sync``, which drives coroutines on one shared background loop.
+"""
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+import httpx
+from google.auth.transport.requests import Request
+
+from app.metrics import CALENDAR_EVENTS_CREATED, GOOGLE_API_ERRORS, GOOGLE_API_RETRIES, GOOGLE_API_SECONDS
+
+GOOGLE_API_BASE_URL = os.environ.get("GOOGLE_API_BASE_URL", "https://www.googleapis.com")
+MAX_CONNECTIONS = int(os.environ.get("GOOGLE_API_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE = int(os.environ.get("GOOGLE_API_MAX_KEEPALIVE", "20"))
+REQUEST_TIMEOUT = float(os.environ.get("GOOGLE_API_TIMEOUT", "30"))
+# upper bound on concurrent message gets issued by a single fetch_messages call
+FETCH_CONCURRENCY = int(os.environ.get("GOOGLE_API_FETCH_CONCURRENCY", "20"))
+MAX_RETRIES = int(os.environ.get("GOOGLE_API_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.environ.get("GOOGLE_API_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("GOOGLE_API_BACKOFF_MAX", "32"))
+# a server-requested wait is honoured beyond BACKOFF_MAX, but not indefinitely
+RETRY_AFTER_MAX = float(os.environ.get("GOOGLE_API_RETRY_AFTER_MAX", "120"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# raised before the request was sent: safe to retry for any method
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based): jittered backoff capped
+    at BACKOFF_MAX, or the Retry-After wait if longer, capped at RETRY_AFTER_MAX.
+    """
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after:
+        try:
+            wait = float(retry_after)
+        except ValueError:
+            try:
+                wait = email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                wait = 0.0
+        delay = max(delay, min(wait, RETRY_AFTER_MAX))
+    return max(0.0, delay)
+
+
+class GoogleAPIError(Exception):
+    """Raised when a Google REST endpoint answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, method: str, path: str, body: str = ""):
+        self.status_code = status_code
+        self.method = method
+        self.path = path
+        self.body = body
+        super().__init__(f"{method} {path} failed with HTTP {status_code}: {body[:200]}")
+
+
+class AsyncGoogleSession:
+    """Pooled HTTP session that signs requests with OAuth user credentials."""
+
+    def __init__(self, creds, base_url: str = None, max_connections: int = None,
+                 max_keepalive: int = None, timeout: float = None, max_retries: int = None):
+        self.creds = creds
+        self.base_url = base_url or GOOGLE_API_BASE_URL
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self._limits = httpx.Limits(
+            max_connections=max_connections or MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive or MAX_KEEPALIVE,
+        )
+        self._timeout = timeout or REQUEST_TIMEOUT
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # created lazily so the pool binds to the loop that first uses it
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, limits=self._limits, timeout=self._timeout
+            )
+            self._refresh_lock = asyncio.Lock()
+        return self._client
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        if not self.creds.valid:
+            async with self._refresh_lock:
+                if not self.creds.valid:
+                    # google-auth only ships a blocking refresh; keep it off the loop
+                    await asyncio.to_thread(self.creds.refresh, Request())
+        return {"Authorization": f"Bearer {self.creds.token}"}
+
+    async def request(self, method: str, path: str, params: Dict = None, json: Dict = None,
+                      api: str = "google", op: str = "other") -> Dict:
+        """
+        Send one signed request; `api` / `op` label the latency and error metrics.
+        429 / 5xx answers and transport errors are retried with backoff before
+        GoogleAPIError (or the httpx error) is raised.
+        """
+        client = self._get_client()
+        retryable = httpx.TransportError if method != "POST" else UNSENT_ERRORS
+        for attempt in range(self.max_retries + 1):
+            headers = await self._auth_headers()
+            try:
+                with GOOGLE_API_SECONDS.labels(api=api, op=op).time():
+                    resp = await client.request(method, path, params=params, json=json, headers=headers)
+            except httpx.HTTPError as exc:
+                if not isinstance(exc, retryable) or attempt == self.max_retries:
+                    GOOGLE_API_ERRORS.labels(api=api, op=op, status="transport").inc()
+                    raise
+                GOOGLE_API_RETRIES.labels(api=api, op=op, status="transport").inc()
+                await asyncio.sleep(retry_delay(attempt))
+                continue
+            if resp.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            GOOGLE_API_RETRIES.labels(api=api, op=op, status=str(resp.status_code)).inc()
+            await asyncio.sleep(retry_delay(attempt, resp.headers.get("Retry-After")))
+        if resp.status_code >= 400:
+            GOOGLE_API_ERRORS.labels(api=api, op=op, status=str(resp.status_code)).inc()
+            raise GoogleAPIError(resp.status_code, method, path, resp.text)
+        if not resp.content:
+            return {}
+        return resp.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncGmailClient:
+    """Gmail v1 operations used by the app: messages list/get/send."""
+
+    def __init__(self, session: AsyncGoogleSession, user_id: str = "me"):
+        self.session = session
+        self.user_id = user_id
+
+    def _path(self, suffix: str = "") -> str:
+        return f"/gmail/v1/users/{self.user_id}/messages{suffix}"
+
+    async def list_messages(self, query: str = None, max_results: int = 50) -> List[Dict]:
+        params = {"maxResults": max_results}
+        if query:
+            params["q"] = query
+        res = await self.session.request("GET", self._path(), params=params, api="gmail", op="list")
+        return res.get("messages", [])
+
+    async def get_message(self, msg_id: str, format: str = "full", metadata_headers: List[str] = None) -> Dict:
+        params = {"format": format}
+        if metadata_headers:
+            params["metadataHeaders"] = metadata_headers
+        return await self.session.request("GET", self._path(f"/{msg_id}"), params=params, api="gmail", op="get")
+
+    async def send_message(self, raw: str) -> Dict:
+        return await self.session.request("POST", self._path("/send"), json={"raw": raw}, api="gmail", op="send")
+
+    async def fetch_messages(self, max_results: int = 40, concurrency: int = None) -> List[Dict]:
+        """
+        List recent messages and fetch their Subject/From/Date headers and snippet concurrently.
+        Messages that still fail after retries are left out; if every one fails, the first error is raised.
+        """
+        messages = await self.list_messages(max_results=max_results)
+        sem = asyncio.Semaphore(concurrency or FETCH_CONCURRENCY)
+
+        async def fetch_one(msg):
+            async with sem:
+                return await self.get_message(msg["id"], format="metadata", metadata_headers=["Subject", "From", "Date"])
+
+        # gather preserves the mailbox order of the list call
+        fetched = await asyncio.gather(*(fetch_one(m) for m in messages), return_exceptions=True)
+        ok = [m for m in fetched if not isinstance(m, BaseException)]
+        failed = [m for m in fetched if isinstance(m, BaseException)]
+        for err in failed:
+            if not isinstance(err, (GoogleAPIError, httpx.HTTPError)):
+                raise err
+        if failed:
+            if not ok:
+                raise failed[0]
+            print(f"[gmail] skipped {len(failed)} of {len(messages)} messages: {failed[0]}")
+        return ok
+
+
+class AsyncCalendarClient:
+    """Calendar v3 operations used by the app: events list/insert/patch."""
+
+    def __init__(self, session: AsyncGoogleSession, calendar_id: str = "primary"):
+        self.session = session
+        self.calendar_id = calendar_id
+
+    def _path(self, suffix: str = "") -> str:
+        return f"/calendar/v3/calendars/{self.calendar_id}/events{suffix}"
+
+    async def list_events(self, time_min: str = None, time_max: str = None, max_results: int = 250) -> List[Dict]:
+        params = {"maxResults": max_results, "singleEvents": "true"}
+        if time_min:
+            params["timeMin"] = time_min
+        if time_max:
+            params["timeMax"] = time_max
+        res = await self.session.request("GET", self._path(), params=params, api="calendar", op="list")
+        return res.get("items", [])
+
+    async def insert_event(self, body: Dict) -> Dict:
+        created = await self.session.request("POST", self._path(), json=body, api="calendar", op="insert")
+        CALENDAR_EVENTS_CREATED.inc()
+        return created
+
+    async def insert_events(self, bodies: List[Dict], concurrency: int = None) -> List[Union[Dict, Exception]]:
+        """
+        Insert events concurrently. Returns one entry per body, in order: the created
+        event, or the GoogleAPIError / httpx error it still failed with after retries.
+        """
+        sem = asyncio.Semaphore(concurrency or FETCH_CONCURRENCY)
+
+        async def insert_one(body):
+            async with sem:
+                return await self.insert_event(body)
+
+        # a failed insert must not hide which of the others went through
+        results = await asyncio.gather(*(insert_one(b) for b in bodies), return_exceptions=True)
+        for r in results:
+            if isinstance(r, BaseException) and not isinstance(r, (GoogleAPIError, httpx.HTTPError)):
+                raise r
+        return results
+
+    async def patch_event(self, event_id: str, body: Dict) -> Dict:
+        return await self.session.request("PATCH", self._path(f"/{event_id}"), json=body, api="calendar", op="patch")
+
+
+# --- sync bridge -----------------------------------------------------------
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            t = threading.Thread(target=_loop.run_forever, name="google-api-loop", daemon=True)
+            t.start()
+        return _loop
+
+
+def run_sync(coro):
+    """Run `coro` on the shared background loop and block until it finishes.
+
+    Safe to call from any thread (Flask workers, the reminder engine); the pooled
+    connections all live on the one background loop.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
@@ -0,0 +1,252 @@
+# app/ics_feed.py
+"""
+iCalendar (.ics) subscription feeds for parsed timetables.
+
+Every uploaded timetable is published under a stable feed key:
+
+    GET /api/calendar/<key>.ics
+
+With a client `doc_token` the key is derived from the token and the filename
+(`feed_key`), so re-uploading a corrected timetable republishes the same URL and
+subscribers pick up the new events. Uploads without a token fall back to the
+SHA-256 of the PDF bytes. Students subscribe to that URL in Google Calendar /
+Outlook / Apple Calendar instead of having one Calendar API insert made per event
+on their behalf.
+
+The content hash of the current upload is the feed's `version`; the ETag is built
+from it, so polling clients get 304s until the timetable actually changes, and
+the feed is never rendered just to be compared. Event UIDs are derived from the
+event's type and title (not its dates), so a moved exam updates in place instead
+of showing up twice. 200 bodies are streamed from a generator in chunks and never
+built up as one string.
+
+Feeds are kept in a bounded in-memory LRU and written to `ICS_FEED_DIR`, so
+subscriptions keep working across restarts.
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import Blueprint, Response, request
+from werkzeug.http import http_date
+
+from app.lru import LRUCache
+from app.records import EventType, TimetableEvent
+from app.utils import client_scoped_key
+
+FEED_DIR = os.environ.get("ICS_FEED_DIR", "./feeds")
+FEED_CACHE_SIZE = int(os.environ.get("ICS_FEED_CACHE_SIZE", "256"))
+FEED_MAX_AGE = int(os.environ.get("ICS_FEED_MAX_AGE", "3600"))
+# bump when the rendered output changes so clients drop their cached copies
+RENDER_VERSION = 1
+CHUNK_SIZE = 16 * 1024
+PRODID = "-//Aura Student Assistant//Timetable Feed//EN"
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def feed_key(file_bytes: bytes, doc_token: str = None, name: str = "") -> str:
+    """
+    Stable key for the feed of timetable `name` uploaded by whoever holds `doc_token`;
+    without a token, the content hash. Raises ValueError on a too-short token.
+    """
+    if doc_token:
+        return client_scoped_key("ics-feed", doc_token, name)
+    return content_hash(file_bytes)
+
+
+class Feed:
+    """The exams / holidays of one timetable, plus the version and time of its last change."""
+
+    __slots__ = ("key", "name", "events", "version", "updated")
+
+    def __init__(self, key: str, name: str, events: List[TimetableEvent], version: str, updated: float):
+        self.key = key
+        self.name = name
+        self.events = events
+        self.version = version
+        self.updated = int(updated)  # whole seconds, as HTTP dates carry no more
+
+    @property
+    def etag(self) -> str:
+        return f"{self.version[:32]}-v{RENDER_VERSION}"
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "version": self.version, "updated": self.updated,
+                "events": [e.to_dict() for e in self.events]}
+
+    @classmethod
+    def from_dict(cls, key: str, d: Dict) -> "Feed":
+        # feeds written before versions were tracked were keyed by their content hash
+        return cls(key, d.get("name", ""), [TimetableEvent.from_dict(e) for e in d.get("events", [])],
+                   d.get("version", key), d.get("updated", d.get("created")))
+
+
+class FeedStore:
+    """Bounded LRU of feeds by feed key, backed by one JSON file per feed."""
+
+    def __init__(self, directory: str = FEED_DIR, maxsize: int = FEED_CACHE_SIZE):
+        self.directory = directory
+        self._feeds = LRUCache(maxsize)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def publish(self, key: str, events: Iterable[TimetableEvent], name: str = "", version: str = None) -> Feed:
+        """
+        Store `events` as the feed for `key`, replacing what was there, unless the stored
+        feed already has this `version` (default: the key). Returns the stored feed.
+        """
+        version = version or key
+        existing = self.get(key)
+        if existing is not None and existing.version == version:
+            return existing
+        events = [e for e in events if e.day is not None and e.type in (EventType.EXAM, EventType.HOLIDAY)]
+        feed = Feed(key, name, events, version, time.time())
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(feed.to_dict(), f)
+            os.replace(tmp, self._path(key))
+        self._feeds.put(key, feed)
+        return feed
+
+    def get(self, key: str) -> Optional[Feed]:
+        if not _KEY_RE.match(key):
+            return None
+        feed = self._feeds.get(key)
+        if feed is not None:
+            return feed
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                feed = Feed.from_dict(key, json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+        self._feeds.put(key, feed)
+        return feed
+
+
+feed_store = FeedStore()
+
+
+# --- rendering ----------------------------------------------------------------
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """Fold a content line to 75 octets per RFC 5545, never splitting a UTF-8 sequence."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_date(day: int) -> str:
+    return datetime.date.fromordinal(day).strftime("%Y%m%d")
+
+
+def _event_uid(e: TimetableEvent, occurrence: int = 0) -> str:
+    # type + title only, so a corrected date updates the event in place; `occurrence`
+    # tells apart repeats of one title (e.g. several "Holiday" rows) in date order
+    digest = hashlib.sha1(f"{e.type.value}|{e.title}|{occurrence}".encode("utf-8")).hexdigest()
+    return f"{digest[:24]}@aura-timetable"
+
+
+def iter_vevent_lines(e: TimetableEvent, stamp: str, occurrence: int = 0) -> Iterator[str]:
+    summary = f"Exam: {e.title}" if e.type is EventType.EXAM else e.title
+    yield "BEGIN:VEVENT"
+    yield f"UID:{_event_uid(e, occurrence)}"
+    yield f"DTSTAMP:{stamp}"
+    yield f"DTSTART;VALUE=DATE:{_ics_date(e.day)}"
+    # all-day DTEND is exclusive
+    yield f"DTEND;VALUE=DATE:{_ics_date(e.last_day + 1)}"
+    yield f"SUMMARY:{_escape(summary)}"
+    yield f"CATEGORIES:{e.type.value.upper()}"
+    yield "TRANSP:TRANSPARENT" if e.type is EventType.HOLIDAY else "TRANSP:OPAQUE"
+    yield "END:VEVENT"
+
+
+def iter_ics(feed: Feed, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the VCALENDAR for `feed` as UTF-8 chunks of roughly `chunk_size` bytes."""
+    stamp = datetime.datetime.fromtimestamp(feed.updated, datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    def lines():
+        yield "BEGIN:VCALENDAR"
+        yield "VERSION:2.0"
+        yield f"PRODID:{PRODID}"
+        yield "CALSCALE:GREGORIAN"
+        yield "METHOD:PUBLISH"
+        yield f"X-WR-CALNAME:{_escape(feed.name or 'Timetable')}"
+        yield f"X-PUBLISHED-TTL:PT{max(1, FEED_MAX_AGE // 60)}M"
+        seen = {}
+        for e in sorted(feed.events, key=lambda e: e.day):
+            occurrence = seen.get((e.type, e.title), 0)
+            seen[(e.type, e.title)] = occurrence + 1
+            yield from iter_vevent_lines(e, stamp, occurrence)
+        yield "END:VCALENDAR"
+
+    buf, size = [], 0
+    for line in lines():
+        piece = _fold(line)
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+# --- HTTP -----------------------------------------------------------------------
+
+ics_bp = Blueprint("ics_feed", __name__)
+
+
+def feed_url(key: str) -> str:
+    return f"/api/calendar/{key}.ics"
+
+
+def _not_modified(feed: Feed) -> bool:
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        return request.if_none_match.contains(feed.etag)
+    since = request.if_modified_since
+    return since is not None and since.timestamp() >= feed.updated
+
+
+@ics_bp.route("/api/calendar/<key>.ics")
+def calendar_feed(key):
+    feed = feed_store.get(key.lower())
+    if feed is None:
+        return Response("unknown calendar feed\n", status=404, mimetype="text/plain")
+
+    headers = {
+        "ETag": f'"{feed.etag}"',
+        "Last-Modified": http_date(feed.updated),
+        "Cache-Control": f"public, max-age={FEED_MAX_AGE}",
+    }
+    if _not_modified(feed):
+        return Response(status=304, headers=headers)
+
+    headers["Content-Disposition"] = f'inline; filename="{key[:12]}.ics"'
+    return Response(iter_ics(feed), status=200, headers=headers, content_type="text/calendar; charset=utf-8")
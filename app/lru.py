@@ -0,0 +1,46 @@
+# app/lru.py
+"""Bounded, thread-safe least-recently-used map shared by the app's in-memory caches."""
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List
+
+
+class LRUCache:
+    """`get` and `put` mark a key as most recently used; `peek` does not. None is not a storable value."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def values(self) -> List[Any]:
+        """Snapshot of the values, least recently used first."""
+        with self._lock:
+            return list(self._data.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
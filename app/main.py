@@ -90,19 +90,26 @@
 
 import os
 import argparse
+from collections import Counter
 from dotenv import load_dotenv
 from flask import Flask, render_template, request, jsonify
 
 
-from app.gmail_client import GmailClient
-from app.agents.email_agent import classify_emails
+from app.gmail_client import get_gmail_client
+from app.agents.email_agent import analyze_email
+from app.agents.token_budget import ScanBudget
 from app.timetable_parser import extract_timetable_info  # PDF parser
 from app.timetable_parser import parse_pdf_timetable
 from app.reminder_scheduler import ReminderScheduler
+from app.records import AnalysisSource, Category, ScanResult
+from app.metrics import EMAILS_FILTERED, KEYWORD_FILTER_SECONDS
+from app.search_index import index_scan_results, search_bp
+from app.utils import json_response
 
 
 load_dotenv()
 app = Flask(__name__)
+app.register_blueprint(search_bp)
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -117,16 +124,24 @@ def index():
 def scan_inbox_api():
     """API endpoint for scanning emails (same logic as CLI)."""
     try:
-        data = request.get_json()
-        max_messages = data.get("max_messages", 40)
+        data = request.get_json(silent=True) or {}
+        max_messages = int(data.get("max_messages", 40))
 
         results, stats = scan_and_flag(max_messages=max_messages)
-        return jsonify({"results": results, "stats": stats})
+        return json_response(scan_payload(results, stats))
     except Exception as e:
         print("[ERROR in /api/scan]:", e)
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/scan/latest", methods=["GET"])
+def latest_scan_api():
+    """Result of the most recent scan; poll it with If-None-Match."""
+    if _last_scan is None:
+        return jsonify({"error": "No scan has run yet"}), 404
+    return json_response(scan_payload(*_last_scan))
+
+
 @app.route("/api/analyze_timetable", methods=["POST"])
 def analyze_timetable():
     """API endpoint for analyzing uploaded timetable PDFs."""
@@ -169,45 +184,74 @@ def upload_and_schedule(timetable_path):
 
 
 
+SCAN_KEYWORDS = ["exam", "test", "assignment", "intern", "interview", "placement"]
+
+
+def matches_keywords(email, keywords=SCAN_KEYWORDS):
+    """Cheap prefilter: does the subject or snippet mention any scan keyword?"""
+    text = (email.subject + email.snippet).lower()
+    return any(k in text for k in keywords)
+
+
+# (results, stats) of the most recent scan, served by GET /api/scan/latest
+_last_scan = None
+
+
+def last_scan():
+    return _last_scan
+
+
+def scan_payload(results, stats):
+    return {"results": [r.to_dict() for r in results], "stats": stats}
+
+
 def scan_and_flag(max_messages=40):
-    """Fetches Gmail messages and classifies important ones."""
-    gmail = GmailClient()
+    """
+    Fetches Gmail messages and classifies important ones.
+
+    stats["analysis"] counts real LLM calls only; cache hits, keyword-only results
+    (token budget exhausted) and errors are reported as "cached", "keyword_only"
+    and "errors".
+    """
+    gmail = get_gmail_client()
     emails = gmail.fetch_messages(max_results=max_messages)
+    budget = ScanBudget()
 
-    analyzed_count = 0
-    skipped_count = 0
-    results = []
-
+    relevant = []
     for e in emails:
-        subject = e["subject"]
-        snippet = e["snippet"]
-
-        keywords = ["exam", "test", "assignment", "intern", "interview", "placement"]
-        if not any(k.lower() in (subject + snippet).lower() for k in keywords):
-            results.append({
-                "subject": subject,
-                "snippet": snippet,
-                "analysis": "Skipped (no relevant keywords found)"
-            })
-            skipped_count += 1
+        with KEYWORD_FILTER_SECONDS.time():
+            is_relevant = matches_keywords(e)
+        EMAILS_FILTERED.labels(outcome="relevant" if is_relevant else "skipped").inc()
+        relevant.append(is_relevant)
+
+    by_source = Counter()
+    results = []
+    # matched emails still to classify; lets the budget spread across the whole scan
+    pending = sum(relevant)
+
+    for e, is_relevant in zip(emails, relevant):
+        if not is_relevant:
+            results.append(ScanResult(e.subject, e.snippet, "Skipped (no relevant keywords found)", Category.SKIPPED,
+                                      AnalysisSource.PREFILTER))
+            by_source[AnalysisSource.PREFILTER] += 1
             continue
 
-        try:
-            analysis = classify_emails(subject, snippet)
-            results.append({
-                "subject": subject,
-                "snippet": snippet,
-                "analysis": analysis
-            })
-            analyzed_count += 1
-        except Exception as ex:
-            results.append({
-                "subject": subject,
-                "snippet": snippet,
-                "analysis": f"Error analyzing email: {ex}"
-            })
-
-    stats = {"analysis": analyzed_count, "skipped": skipped_count}
+        result = analyze_email(e, budget, pending)
+        pending -= 1
+        results.append(result)
+        by_source[result.source] += 1
+
+    stats = {
+        "analysis": by_source[AnalysisSource.LLM],
+        "cached": by_source[AnalysisSource.CACHE],
+        "keyword_only": by_source[AnalysisSource.KEYWORD_ONLY],
+        "errors": by_source[AnalysisSource.ERROR],
+        "skipped": by_source[AnalysisSource.PREFILTER],
+        **budget.stats(),
+    }
+    stats["indexed"] = index_scan_results(emails, results)
+    global _last_scan
+    _last_scan = (results, stats)
     return results, stats
 
 if __name__ == "__main__":
@@ -215,9 +259,17 @@ if __name__ == "__main__":
     parser.add_argument("--upload", help="Path to timetable CSV")
     parser.add_argument("--scan", action="store_true", help="Scan inbox and classify")
     parser.add_argument("--web", action="store_true", help="Launch web interface")
+    parser.add_argument("--bulk", help="Directory or glob of timetable PDFs to ingest in parallel")
+    parser.add_argument("--out", default="timetables.jsonl", help="JSONL output for --bulk (appended)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --bulk (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-file parse timeout in seconds for --bulk")
+    parser.add_argument("--engine", choices=["pymupdf", "pdfplumber"], default="pymupdf", help="Parser engine for --bulk")
     args = parser.parse_args()
 
-    if args.upload:
+    if args.bulk:
+        from app.bulk_ingest import run_bulk, print_stats
+        print_stats(run_bulk(args.bulk, args.out, workers=args.workers, timeout=args.timeout, engine=args.engine))
+    elif args.upload:
         upload_and_schedule(args.upload)
     elif args.scan:
         scan_and_flag()
@@ -225,4 +277,4 @@ if __name__ == "__main__":
         print("🚀 Starting Flask web interface at http://127.0.0.1:5000")
         app.run(debug=True)
     else:
-        print("Use one of: --upload PATH | --scan | --web")
+        print("Use one of: --upload PATH | --bulk DIR_OR_GLOB | --scan | --web")
@@ -0,0 +1,289 @@
+# app/metrics.py
+"""
+In-process counters and histograms for the scan / timetable pipeline, rendered in
+Prometheus text exposition format by the `/metrics` endpoint.
+
+Recording is a dict lookup, a bisect and an add under a per-series lock; all
+formatting work happens only when `/metrics` is scraped.
+
+    with GOOGLE_API_SECONDS.labels(api="gmail", op="list").time():
+        ...
+    LLM_TOKENS.labels(kind="prompt").inc(412)
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# seconds; covers sub-millisecond date parsing up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_upper", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._upper = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        i = bisect_left(self._upper, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _samples(self) -> List[str]:
+        out = []
+        for key, child in sorted(self._children.items()):
+            out.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}")
+        return out
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in sorted(self._children.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def _samples(self) -> List[str]:
+        out = []
+        for key, child in sorted(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for upper, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = ("le", _format_value(upper))
+                out.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            out.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            out.append(f"{self.name}_count{labels} {cumulative}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+# --- pipeline metrics --------------------------------------------------------
+
+GOOGLE_API_SECONDS = histogram(
+    "aura_google_api_request_seconds", "Latency of Gmail / Calendar REST calls.", ("api", "op"))
+GOOGLE_API_ERRORS = counter(
+    "aura_google_api_errors", "Gmail / Calendar REST calls that failed, by HTTP status.", ("api", "op", "status"))
+GOOGLE_API_RETRIES = counter(
+    "aura_google_api_retries", "Gmail / Calendar REST calls retried after a 429 / 5xx, by status.",
+    ("api", "op", "status"))
+
+# the prefilter takes ~2us per email; the default buckets would put every sample in the first one
+KEYWORD_FILTER_SECONDS = histogram(
+    "aura_keyword_filter_seconds", "Time spent in the keyword prefilter per email.",
+    buckets=(0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.001))
+EMAILS_FILTERED = counter(
+    "aura_emails_filtered", "Emails seen by the keyword prefilter, by outcome.", ("outcome",))
+
+LLM_SECONDS = histogram(
+    "aura_llm_call_seconds", "Latency of LLM classification calls.", ("model",))
+LLM_CALLS = counter(
+    "aura_llm_calls", "LLM classification calls, by outcome.", ("model", "outcome"))
+LLM_TOKENS = counter(
+    "aura_llm_tokens", "Tokens reported by the LLM provider.", ("model", "kind"))
+
+PDF_PAGE_SECONDS = histogram(
+    "aura_pdf_page_extract_seconds", "Text extraction time per PDF page.", ("engine",))
+PDF_PAGES = counter(
+    "aura_pdf_pages", "PDF pages seen, by engine and whether text was extracted or cached.", ("engine", "source"))
+DATE_PARSE_SECONDS = histogram(
+    "aura_date_parse_seconds", "Time per date-string parse attempt.", ("engine",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01))
+
+CALENDAR_EVENTS_CREATED = counter(
+    "aura_calendar_events_created", "Calendar events inserted.")
+
+REMINDERS_PENDING = gauge(
+    "aura_reminders_pending", "Pending reminders, in the in-memory heap or only on disk.", ("where",))
+REMINDER_HEAP_BYTES = gauge(
+    "aura_reminder_heap_bytes", "Approximate memory held by the reminder heap and its key index.")
+REMINDER_DISPATCH_LAG_SECONDS = histogram(
+    "aura_reminder_dispatch_lag_seconds", "Delay between a reminder's due time and its dispatch.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 3600.0))
+REMINDERS_DISPATCHED = counter(
+    "aura_reminders_dispatched", "Reminders handed to the sender, by outcome.", ("outcome",))
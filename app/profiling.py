@@ -0,0 +1,177 @@
+# app/profiling.py
+"""
+Opt-in, per-request profiling for the Flask app.
+
+Enable with `PROFILING_ENABLED` (env AURA_PROFILING=1), then send a request with
+the `X-Profile` header to run just that request under cProfile:
+
+    curl -H "X-Profile: 1" -F file=@tt.pdf http://127.0.0.1:5000/api/upload_timetable
+    curl -H "X-Profile: 1" http://127.0.0.1:5000/api/profiles                     # list
+    curl -H "X-Profile: 1" -o up.prof http://127.0.0.1:5000/api/profiles/<id>     # pstats / snakeviz file
+    curl -H "X-Profile: 1" "http://127.0.0.1:5000/api/profiles/<id>?format=text"  # top functions
+    # text options: &sort=<pstats.SortKey value, default cumulative>&limit=<rows, default 40>
+
+If `PROFILING_TOKEN` is set, the header value must equal it, for profiling and for
+the listing/download endpoints alike. Only the newest `PROFILING_MAX_PROFILES`
+profiles are kept in memory. Everything is read from `app.config` per request, so
+the flag can be flipped at runtime.
+"""
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import time
+from typing import Dict, List, Optional
+
+from flask import Blueprint, Response, abort, current_app, g, jsonify, request
+
+from app.lru import LRUCache
+
+PROFILE_HEADER = "X-Profile"
+EXTENSION_KEY = "aura_profiles"
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)
+
+
+class ProfileStore:
+    """Bounded, thread-safe store of finished request profiles (oldest evicted first)."""
+
+    def __init__(self, max_profiles: int):
+        self.max_profiles = max_profiles
+        self._profiles = LRUCache(max_profiles)
+        self._ids = itertools.count(1)
+
+    def add(self, meta: Dict, stats: Dict) -> str:
+        profile_id = f"{int(time.time())}-{next(self._ids)}"
+        meta = dict(meta, id=profile_id)
+        self._profiles.put(profile_id, (meta, marshal.dumps(stats)))
+        return profile_id
+
+    def list(self) -> List[Dict]:
+        return [meta for meta, _ in reversed(self._profiles.values())]
+
+    def get(self, profile_id: str) -> Optional[tuple]:
+        # peek: downloading a profile must not reorder the list or its eviction
+        return self._profiles.peek(profile_id)
+
+
+def _enabled() -> bool:
+    return bool(current_app.config.get("PROFILING_ENABLED"))
+
+
+def _authorized() -> bool:
+    value = request.headers.get(PROFILE_HEADER)
+    token = current_app.config.get("PROFILING_TOKEN")
+    if token:
+        return value == token
+    return value is not None and value.lower() in ("1", "true", "yes")
+
+
+def _start_profile():
+    if request.blueprint == profiles_bp.name or not _enabled() or not _authorized():
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # another profiler is already active on this thread
+        return
+    g._aura_profiler = (profiler, time.perf_counter())
+
+
+def _finish_profile(response):
+    entry = g.pop("_aura_profiler", None)
+    if entry is None:
+        return response
+    profiler, start = entry
+    profiler.disable()
+    elapsed = time.perf_counter() - start
+    profiler.create_stats()
+
+    store: ProfileStore = current_app.extensions[EXTENSION_KEY]
+    profile_id = store.add({
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": round(elapsed * 1000, 2),
+        "created": time.time(),
+    }, profiler.stats)
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def _abandon_profile(exc):
+    # after_request is skipped on unhandled errors; make sure the profiler stops
+    entry = g.pop("_aura_profiler", None)
+    if entry is not None:
+        entry[0].disable()
+
+
+profiles_bp = Blueprint("profiles", __name__)
+
+
+@profiles_bp.before_request
+def _guard():
+    if not _enabled():
+        abort(404)
+    if not _authorized():
+        abort(403)
+
+
+@profiles_bp.route("/api/profiles")
+def list_profiles():
+    return jsonify({"profiles": current_app.extensions[EXTENSION_KEY].list()})
+
+
+@profiles_bp.route("/api/profiles/<profile_id>")
+def download_profile(profile_id):
+    found = current_app.extensions[EXTENSION_KEY].get(profile_id)
+    if found is None:
+        return jsonify({"error": "unknown profile id"}), 404
+    _, data = found
+
+    if request.args.get("format") == "text":
+        sort = request.args.get("sort", pstats.SortKey.CUMULATIVE.value)
+        if sort not in SORT_KEYS:
+            return jsonify({"error": f"sort must be one of: {', '.join(sorted(SORT_KEYS))}"}), 400
+        try:
+            limit = int(request.args.get("limit", 40))
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsHolder(marshal.loads(data)), stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return Response(out.getvalue(), mimetype="text/plain")
+
+    # same on-disk format as pstats.Stats.dump_stats, loadable by pstats / snakeviz
+    return Response(data, mimetype="application/octet-stream", headers={
+        "Content-Disposition": f'attachment; filename="{profile_id}.prof"'
+    })
+
+
+class _StatsHolder:
+    """Minimal object pstats.Stats accepts in place of a Profile."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def init_profiling(app):
+    """Install the profiling hooks and endpoints on a Flask app."""
+    app.config.setdefault("PROFILING_ENABLED", os.environ.get("AURA_PROFILING", "0").lower() in ("1", "true", "yes"))
+    app.config.setdefault("PROFILING_TOKEN", os.environ.get("AURA_PROFILING_TOKEN") or None)
+    app.config.setdefault("PROFILING_MAX_PROFILES", int(os.environ.get("AURA_PROFILING_MAX_PROFILES", "50")))
+
+    app.extensions[EXTENSION_KEY] = ProfileStore(app.config["PROFILING_MAX_PROFILES"])
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_abandon_profile)
+    app.register_blueprint(profiles_bp)
+    return app
@@ -0,0 +1,199 @@
+# app/records.py
+"""
+Typed records passed between the Gmail, LLM, timetable and Calendar layers.
+
+Records are frozen, slotted dataclasses; calendar dates are kept as proleptic
+ordinals (`date.toordinal()`), email receive times as unix timestamps, and
+categories/types are enums, so each record is a few pointers and small ints. Conversion to JSON-ready dicts happens once, at the
+HTTP boundary, through the `to_dict` / `*_to_json` helpers below.
+"""
+import datetime
+import re
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Dict, List, Optional
+
+
+class EventType(str, Enum):
+    EXAM = "Exam"
+    HOLIDAY = "Holiday"
+    OTHER = "Other"
+
+
+class Category(str, Enum):
+    IMPORTANT = "IMPORTANT"
+    POTENTIALLY_IMPORTANT = "POTENTIALLY_IMPORTANT"
+    IRRELEVANT = "IRRELEVANT"
+    SKIPPED = "SKIPPED"
+    ERROR = "ERROR"
+    UNKNOWN = "UNKNOWN"
+
+    @classmethod
+    def from_analysis(cls, analysis: str) -> "Category":
+        """Pick the category label out of the LLM's (loosely) JSON answer."""
+        # POTENTIALLY_IMPORTANT must be tried before IMPORTANT
+        m = re.search(r"POTENTIALLY_IMPORTANT|IMPORTANT|IRRELEVANT", analysis or "")
+        return cls(m.group(0)) if m else cls.UNKNOWN
+
+
+class AnalysisSource(str, Enum):
+    """Where a ScanResult's analysis came from."""
+    LLM = "llm"
+    CACHE = "cache"
+    KEYWORD_ONLY = "keyword_only"  # LLM skipped because the token budget ran out
+    PREFILTER = "prefilter"        # no scan keyword matched; never sent to the LLM
+    ERROR = "error"
+
+    @property
+    def is_llm_answer(self) -> bool:
+        return self in (AnalysisSource.LLM, AnalysisSource.CACHE)
+
+
+def to_ordinal(d: datetime.date) -> int:
+    return d.toordinal()
+
+
+def ordinal_to_iso(day: Optional[int]) -> Optional[str]:
+    return datetime.date.fromordinal(day).isoformat() if day is not None else None
+
+
+def iso_to_ordinal(s: Optional[str]) -> Optional[int]:
+    return datetime.date.fromisoformat(s).toordinal() if s else None
+
+
+@dataclass(frozen=True, slots=True)
+class EmailRecord:
+    subject: str
+    snippet: str
+    id: str = ""
+    sender: str = ""
+    timestamp: float = 0.0  # unix time the message was received, 0 if unknown
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "subject": self.subject, "snippet": self.snippet, "sender": self.sender,
+                "timestamp": self.timestamp}
+
+
+@dataclass(frozen=True, slots=True)
+class ScanResult:
+    subject: str
+    snippet: str
+    analysis: str
+    category: Category
+    source: AnalysisSource = AnalysisSource.LLM
+
+    def to_dict(self) -> Dict:
+        return {
+            "subject": self.subject,
+            "snippet": self.snippet,
+            "analysis": self.analysis,
+            "category": self.category.value,
+            "source": self.source.value,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class TimetableEvent:
+    """
+    One dated timetable entry. `day` is a date ordinal, or None if no date was found.
+    Multi-day entries (breaks, exam weeks) set `end_day`, the inclusive last day.
+    """
+    day: Optional[int]
+    title: str
+    type: EventType
+    raw_line: str = ""
+    end_day: Optional[int] = None
+
+    @property
+    def date(self) -> Optional[datetime.date]:
+        return datetime.date.fromordinal(self.day) if self.day is not None else None
+
+    @property
+    def date_iso(self) -> Optional[str]:
+        return ordinal_to_iso(self.day)
+
+    @property
+    def last_day(self) -> Optional[int]:
+        return self.end_day if self.end_day is not None else self.day
+
+    @property
+    def end_date(self) -> Optional[datetime.date]:
+        return datetime.date.fromordinal(self.last_day) if self.day is not None else None
+
+    @property
+    def end_date_iso(self) -> Optional[str]:
+        return ordinal_to_iso(self.last_day)
+
+    @property
+    def is_range(self) -> bool:
+        return self.end_day is not None and self.end_day != self.day
+
+    def to_dict(self) -> Dict:
+        """Shape used by /api/upload_timetable and /api/add_events."""
+        return {
+            "date": self.date_iso,
+            "end_date": self.end_date_iso,
+            "event": self.title,
+            "type": self.type.value,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "TimetableEvent":
+        """Inverse of `to_dict`, for events posted back by the frontend."""
+        try:
+            etype = EventType(d.get("type"))
+        except ValueError:
+            etype = EventType.OTHER
+        day = iso_to_ordinal(d.get("date"))
+        end_day = iso_to_ordinal(d.get("end_date"))
+        return cls(day=day, title=d.get("event") or "", type=etype,
+                   end_day=end_day if end_day is not None and day is not None and end_day > day else None)
+
+
+# a timetable's "Day" column: per-day text that must stay out of titles, or
+# merge_intervals would never join adjacent days of the same holiday
+_LEADING_WEEKDAY = re.compile(
+    r"^(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tues?|wed|thu(?:rs?)?|fri|sat|sun)\b\.?[\s,:|-]*",
+    re.IGNORECASE
+)
+
+
+def strip_leading_weekday(title: str) -> str:
+    return _LEADING_WEEKDAY.sub("", title)
+
+
+def merge_intervals(events: List[TimetableEvent]) -> List[TimetableEvent]:
+    """
+    Collapse same-titled, same-typed entries whose days touch or overlap into one
+    interval, in a single pass over the entries sorted by (type, title, day).
+    Returns the merged entries ordered by start day; undated entries go last.
+    """
+    dated = sorted((e for e in events if e.day is not None), key=lambda e: (e.type.value, e.title, e.day))
+    merged: List[TimetableEvent] = []
+    for e in dated:
+        prev = merged[-1] if merged else None
+        if prev is not None and prev.type is e.type and prev.title == e.title and e.day <= prev.last_day + 1:
+            if e.last_day > prev.last_day:
+                merged[-1] = replace(prev, end_day=e.last_day)
+            continue
+        merged.append(e)
+    merged.sort(key=lambda e: e.day)
+    return merged + [e for e in events if e.day is None]
+
+
+def events_to_json(events: List[TimetableEvent]) -> List[Dict]:
+    return [e.to_dict() for e in events]
+
+
+def timetable_text_to_json(parsed: Dict[str, List[TimetableEvent]]) -> Dict[str, List[Dict]]:
+    """JSON shape of `parse_timetable_text` results: exams carry `subject`, holidays `reason`."""
+    return {
+        "exams": [
+            {"date": e.date_iso, "end_date": e.end_date_iso, "subject": e.title, "raw_line": e.raw_line}
+            for e in parsed.get("exams", [])
+        ],
+        "holidays": [
+            {"date": h.date_iso, "end_date": h.end_date_iso, "reason": h.title or None, "raw_line": h.raw_line}
+            for h in parsed.get("holidays", [])
+        ],
+    }
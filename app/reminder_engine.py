@@ -0,0 +1,291 @@
+# app/reminder_engine.py
+"""
+Reminder engine built for hundreds of thousands of pending reminders.
+
+- Every reminder lives in a small SQLite table (`REMINDER_DB_PATH`), keyed by a
+  caller-chosen key, so re-scheduling the same key replaces the reminder instead
+  of duplicating it and pending reminders survive restarts.
+- Only reminders due within the current window (`REMINDER_WINDOW_SECONDS`) are
+  loaded into memory, as `(due, seq, key)` tuples in a min-heap; subject and body
+  stay on disk until the reminder fires. Later windows are loaded as time moves on.
+- One dispatcher thread pops due entries and fires them in batches of up to
+  `REMINDER_BATCH_SIZE`; failures are retried with a growing delay.
+- Cancellation removes the row and drops the key from the in-memory index; the
+  stale heap entry is skipped when it reaches the top.
+
+Heap / on-disk counts, heap memory and dispatch lag are exported through
+`app.metrics`.
+"""
+import heapq
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.metrics import (REMINDER_DISPATCH_LAG_SECONDS, REMINDER_HEAP_BYTES, REMINDERS_DISPATCHED,
+                         REMINDERS_PENDING)
+
+DB_PATH = os.environ.get("REMINDER_DB_PATH", "./reminders.db")
+WINDOW_SECONDS = float(os.environ.get("REMINDER_WINDOW_SECONDS", str(6 * 3600)))
+BATCH_SIZE = int(os.environ.get("REMINDER_BATCH_SIZE", "100"))
+MAX_ATTEMPTS = int(os.environ.get("REMINDER_MAX_ATTEMPTS", "3"))
+RETRY_DELAY_SECONDS = float(os.environ.get("REMINDER_RETRY_DELAY_SECONDS", "60"))
+
+# tuple + float + int objects of one heap entry plus the key's slot in the index
+_ENTRY_OVERHEAD = sys.getsizeof((0.0, 0, "")) + sys.getsizeof(1.5) + sys.getsizeof(2 ** 40) + 100
+
+
+@dataclass(frozen=True, slots=True)
+class Reminder:
+    key: str
+    due: float  # unix timestamp
+    subject: str
+    body: str
+    to_email: str = ""
+    attempts: int = 0
+
+
+class ReminderStore:
+    """SQLite-backed pending reminders; the engine's source of truth."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        # one connection shared by the callers and the dispatcher thread, under a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reminders ("
+                " key TEXT PRIMARY KEY, due REAL NOT NULL, to_email TEXT NOT NULL DEFAULT '',"
+                " subject TEXT NOT NULL, body TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS reminders_due ON reminders (due)")
+            # kept up to date by the writes below; a full COUNT(*) only runs here
+            self._pending = self._conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+    def upsert_many(self, reminders: Iterable[Reminder]):
+        rows = [(r.key, r.due, r.to_email, r.subject, r.body, r.attempts) for r in reminders]
+        keys = list({row[0] for row in rows})
+        with self._lock:
+            self._conn.execute("BEGIN")
+            existing = 0
+            # primary-key lookups for this batch only; replaced keys do not add to the count
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                existing += self._conn.execute(
+                    f"SELECT COUNT(*) FROM reminders WHERE key IN ({','.join('?' * len(chunk))})", chunk).fetchone()[0]
+            self._conn.executemany("INSERT OR REPLACE INTO reminders VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+            self._pending += len(keys) - existing
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = [(k,) for k in keys]
+        with self._lock:
+            return self._delete("DELETE FROM reminders WHERE key = ?", keys)
+
+    def remove_dispatched(self, reminders: Iterable[Reminder]):
+        """Delete fired reminders, unless their key was re-scheduled in the meantime."""
+        rows = [(r.key, r.due) for r in reminders]
+        with self._lock:
+            self._delete("DELETE FROM reminders WHERE key = ? AND due = ?", rows)
+
+    def _delete(self, sql: str, rows: List[tuple]) -> int:
+        """Run a batched DELETE (caller holds the lock) and return how many rows it removed."""
+        before = self._conn.total_changes
+        self._conn.execute("BEGIN")
+        self._conn.executemany(sql, rows)
+        self._conn.execute("COMMIT")
+        removed = self._conn.total_changes - before
+        self._pending -= removed
+        return removed
+
+    def due_between(self, start: Optional[float], end: float) -> List[Tuple[float, str]]:
+        """(due, key) of reminders with start <= due < end (no lower bound when start is None)."""
+        with self._lock:
+            if start is None:
+                cur = self._conn.execute("SELECT due, key FROM reminders WHERE due < ?", (end,))
+            else:
+                cur = self._conn.execute("SELECT due, key FROM reminders WHERE due >= ? AND due < ?", (start, end))
+            return cur.fetchall()
+
+    def load(self, keys: List[str]) -> Dict[str, Reminder]:
+        out = {}
+        with self._lock:
+            # stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                cur = self._conn.execute(
+                    "SELECT key, due, subject, body, to_email, attempts FROM reminders"
+                    f" WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                for row in cur:
+                    out[row[0]] = Reminder(*row)
+        return out
+
+    def count(self) -> int:
+        """Pending reminders, without scanning the table."""
+        with self._lock:
+            return self._pending
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ReminderEngine:
+    """Windowed min-heap of due times with a single batching dispatcher thread."""
+
+    def __init__(self, send: Callable[[Reminder], None], store: ReminderStore = None,
+                 window_seconds: float = WINDOW_SECONDS, batch_size: int = BATCH_SIZE,
+                 max_attempts: int = MAX_ATTEMPTS, retry_delay: float = RETRY_DELAY_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.send = send
+        self.store = store or ReminderStore()
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, float] = {}  # key -> due of its current heap entry
+        self._seq = itertools.count()
+        self._horizon: Optional[float] = None  # everything due before this is in the heap
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    # --- public API -------------------------------------------------------
+
+    def schedule(self, reminders: Iterable[Reminder]) -> int:
+        """Add or replace reminders by key. Returns how many were scheduled."""
+        reminders = list(reminders)
+        if not reminders:
+            return 0
+        self.store.upsert_many(reminders)
+        with self._cond:
+            for r in reminders:
+                if self._horizon is not None and r.due < self._horizon:
+                    self._push(r.due, r.key)
+                else:
+                    # outside the loaded window (or replaced by a later due): stays on disk
+                    self._live.pop(r.key, None)
+            self._cond.notify()
+        self._report()
+        return len(reminders)
+
+    def cancel(self, key: str) -> bool:
+        removed = self.store.delete([key]) > 0
+        with self._cond:
+            self._live.pop(key, None)
+        self._report()
+        return removed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        with self._cond:
+            self._refill(self.clock())
+        self._thread = threading.Thread(target=self._run, name="reminder-dispatcher", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._cond:
+            heap = len(self._live)
+            heap_bytes = self._heap_bytes()
+        return {"in_heap": heap, "pending_total": self.store.count(), "heap_bytes": heap_bytes}
+
+    # --- internals --------------------------------------------------------
+
+    def _push(self, due: float, key: str):
+        self._live[key] = due
+        heapq.heappush(self._heap, (due, next(self._seq), key))
+
+    def _refill(self, now: float):
+        """Load the next window of reminders from disk into the heap (caller holds the lock)."""
+        end = now + self.window_seconds
+        for due, key in self.store.due_between(self._horizon, end):
+            self._push(due, key)
+        self._horizon = end
+
+    def _heap_bytes(self) -> int:
+        return sys.getsizeof(self._heap) + sys.getsizeof(self._live) + len(self._heap) * _ENTRY_OVERHEAD
+
+    def _report(self):
+        with self._cond:
+            in_heap = len(self._live)
+            heap_bytes = self._heap_bytes()
+        REMINDERS_PENDING.labels(where="heap").set(in_heap)
+        REMINDERS_PENDING.labels(where="disk_only").set(max(0, self.store.count() - in_heap))
+        REMINDER_HEAP_BYTES.set(heap_bytes)
+
+    def _pop_due(self, now: float) -> List[str]:
+        batch = []
+        while self._heap and len(batch) < self.batch_size and self._heap[0][0] <= now:
+            due, _, key = heapq.heappop(self._heap)
+            if self._live.get(key) != due:
+                continue  # cancelled or rescheduled since this entry was pushed
+            del self._live[key]
+            batch.append(key)
+        # drop stale entries left on top by cancellations, so they do not pin memory
+        while self._heap and self._live.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                now = self.clock()
+                if now >= self._horizon - self.window_seconds / 2:
+                    self._refill(now)
+                batch = self._pop_due(now)
+                if not batch:
+                    next_due = self._heap[0][0] if self._heap else self._horizon
+                    wake_at = min(next_due, self._horizon - self.window_seconds / 2)
+                    self._cond.wait(max(0.0, min(wake_at - now, self.window_seconds)))
+                    continue
+            self._dispatch(batch)
+            self._report()
+
+    def _dispatch(self, keys: List[str]):
+        reminders = self.store.load(keys)
+        done, retry = [], []
+        now = self.clock()
+        for key in keys:
+            r = reminders.get(key)
+            if r is None or r.due > now:
+                continue  # cancelled or moved to a later time between pop and load
+            REMINDER_DISPATCH_LAG_SECONDS.observe(max(0.0, now - r.due))
+            try:
+                self.send(r)
+            except Exception as e:
+                print(f"[reminders] send failed for {r.key} (attempt {r.attempts + 1}): {e}")
+                if r.attempts + 1 < self.max_attempts:
+                    REMINDERS_DISPATCHED.labels(outcome="retried").inc()
+                    delay = self.retry_delay * (r.attempts + 1)
+                    retry.append(Reminder(r.key, now + delay, r.subject, r.body, r.to_email, r.attempts + 1))
+                    continue
+                REMINDERS_DISPATCHED.labels(outcome="failed").inc()
+            else:
+                REMINDERS_DISPATCHED.labels(outcome="sent").inc()
+            done.append(r)
+        if done:
+            self.store.remove_dispatched(done)
+        if retry:
+            self.schedule(retry)
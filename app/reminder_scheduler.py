@@ -1,28 +1,56 @@
 # app/reminder_scheduler.py
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
+import hashlib
 import os
+from datetime import datetime
+
+from app.reminder_engine import Reminder, ReminderEngine
+
+
+def reminder_key(reminder) -> str:
+    """
+    Explicit 'key' if given, else derived from recipient + when + subject, so re-runs
+    do not duplicate and different students' identical reminders stay separate.
+    """
+    if reminder.get("key"):
+        return str(reminder["key"])
+    to_email = reminder.get("to") or os.environ.get("GMAIL_USER_EMAIL", "")
+    raw = f"{to_email.strip().lower()}|{reminder['when'].isoformat()}|{reminder['subject']}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
 
 class ReminderScheduler:
-    def __init__(self, gmail_client):
-        self.scheduler = BackgroundScheduler()
+    def __init__(self, gmail_client, engine: ReminderEngine = None):
         self.gmail = gmail_client
+        self.engine = engine or ReminderEngine(self._send_email)
 
     def schedule_reminders(self, reminders):
-        for i, r in enumerate(reminders):
-            run_time = r['when']
-            if run_time > datetime.now():
-                self.scheduler.add_job(self._send_email, 'date', run_date=run_time, args=[r], id=f"reminder_{i}")
+        """Schedule reminder dicts ({when, subject, body[, key, to]}); same key replaces, past ones are skipped."""
+        now = datetime.now()
+        records = [
+            Reminder(
+                key=reminder_key(r),
+                due=r['when'].timestamp(),
+                subject=r['subject'],
+                body=r['body'],
+                to_email=r.get('to') or "",
+            )
+            for r in reminders
+            if r['when'] > now
+        ]
+        return self.engine.schedule(records)
+
+    def cancel(self, key):
+        return self.engine.cancel(key)
 
-    def _send_email(self, reminder):
+    def _send_email(self, reminder: Reminder):
         self.gmail.send_message(
-            to_email=os.environ.get("GMAIL_USER_EMAIL"),
-            subject=reminder['subject'],
-            body_text=reminder['body']
+            to_email=reminder.to_email or os.environ.get("GMAIL_USER_EMAIL"),
+            subject=reminder.subject,
+            body_text=reminder.body
         )
 
     def start(self):
-        self.scheduler.start()
+        self.engine.start()
 
     def shutdown(self):
-        self.scheduler.shutdown()
+        self.engine.shutdown()
@@ -0,0 +1,234 @@
+# app/search_index.py
+"""
+Local full-text index over scanned emails and their classifications.
+
+`scan_and_flag` upserts every scanned email (keyed by Gmail message ID) into a
+SQLite database at `SEARCH_INDEX_PATH`; an FTS5 table over subject, snippet,
+sender and the LLM analysis is kept in sync by triggers. `/api/search` answers
+from the index alone, with no Gmail or LLM calls:
+
+    GET /api/search?q=internship interview&category=IMPORTANT&since=2025-10-01&until=2025-10-15
+
+Re-scanning an unchanged email is a no-op. Each row records where its analysis
+came from (`AnalysisSource`); a result the LLM never produced (keyword-only
+under budget pressure, prefilter skip or error) is stored for new emails but
+never overwrites an earlier LLM or cached analysis.
+"""
+import datetime
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Blueprint, jsonify, request
+
+from app.records import AnalysisSource, Category, EmailRecord, ScanResult
+
+# set to an empty string to turn indexing off
+INDEX_PATH = os.environ.get("SEARCH_INDEX_PATH", "./email_index.db")
+MAX_LIMIT = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    subject TEXT NOT NULL,
+    snippet TEXT NOT NULL,
+    sender TEXT NOT NULL DEFAULT '',
+    date REAL NOT NULL DEFAULT 0,
+    category TEXT NOT NULL,
+    analysis TEXT NOT NULL DEFAULT '',
+    indexed_at REAL NOT NULL,
+    source TEXT NOT NULL DEFAULT 'llm'
+);
+CREATE INDEX IF NOT EXISTS emails_date ON emails (date);
+CREATE INDEX IF NOT EXISTS emails_category_date ON emails (category, date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+    subject, snippet, sender, analysis,
+    content='emails', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS emails_ai AFTER INSERT ON emails BEGIN
+    INSERT INTO emails_fts (rowid, subject, snippet, sender, analysis)
+    VALUES (new.rowid, new.subject, new.snippet, new.sender, new.analysis);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_ad AFTER DELETE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, snippet, sender, analysis)
+    VALUES ('delete', old.rowid, old.subject, old.snippet, old.sender, old.analysis);
+END;
+CREATE TRIGGER IF NOT EXISTS emails_au AFTER UPDATE ON emails BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, snippet, sender, analysis)
+    VALUES ('delete', old.rowid, old.subject, old.snippet, old.sender, old.analysis);
+    INSERT INTO emails_fts (rowid, subject, snippet, sender, analysis)
+    VALUES (new.rowid, new.subject, new.snippet, new.sender, new.analysis);
+END;
+"""
+
+_LLM_SOURCES = ", ".join(f"'{s.value}'" for s in AnalysisSource if s.is_llm_answer)
+
+# only rows whose content actually changed are rewritten (and re-tokenized), and a
+# non-LLM result never replaces an LLM one
+_UPSERT = f"""
+INSERT INTO emails (id, subject, snippet, sender, date, category, analysis, indexed_at, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    subject = excluded.subject, snippet = excluded.snippet, sender = excluded.sender,
+    date = excluded.date, category = excluded.category, analysis = excluded.analysis,
+    indexed_at = excluded.indexed_at, source = excluded.source
+WHERE (excluded.source IN ({_LLM_SOURCES}) OR emails.source NOT IN ({_LLM_SOURCES})) AND (
+    emails.category != excluded.category OR emails.analysis != excluded.analysis
+    OR emails.subject != excluded.subject OR emails.snippet != excluded.snippet
+    OR emails.sender != excluded.sender OR emails.date != excluded.date)
+"""
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def parse_day(value: Optional[str], end_of_day: bool = False) -> Optional[float]:
+    """YYYY-MM-DD (local time) -> unix timestamp; `end_of_day` gives the next midnight."""
+    if not value:
+        return None
+    day = datetime.date.fromisoformat(value)
+    if end_of_day:
+        day += datetime.timedelta(days=1)
+    return datetime.datetime(day.year, day.month, day.day).timestamp()
+
+
+class EmailSearchIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        # shared by Flask worker threads; sqlite3 connections are not, so serialize
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(emails)")}
+            if "source" not in columns:
+                # indexes created before sources were tracked: trust only rows that are not errors
+                self._conn.execute("ALTER TABLE emails ADD COLUMN source TEXT NOT NULL DEFAULT 'llm'")
+                self._conn.execute("UPDATE emails SET source = 'error' WHERE category = 'ERROR'")
+
+    def upsert(self, pairs: Iterable[Tuple[EmailRecord, ScanResult]]) -> int:
+        """Index (email, scan result) pairs by message ID; returns how many rows changed."""
+        now = time.time()
+        rows = [
+            (e.id, e.subject, e.snippet, e.sender, e.timestamp, r.category.value, r.analysis, now, r.source.value)
+            for e, r in pairs if e.id
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            # rowcount sums the direct changes only, so FTS trigger writes are not counted
+            changed = self._conn.executemany(_UPSERT, rows).rowcount
+            self._conn.execute("COMMIT")
+        return changed
+
+    def search(self, query: str = "", categories: List[str] = None, since: float = None,
+               until: float = None, limit: int = 20, offset: int = 0) -> List[Dict]:
+        where, params = [], []
+        match = fts_query(query)
+        if match:
+            where.append("emails_fts MATCH ?")
+            params.append(match)
+        if categories:
+            where.append(f"e.category IN ({','.join('?' * len(categories))})")
+            params.extend(categories)
+        if since is not None:
+            where.append("e.date >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("e.date < ?")
+            params.append(until)
+
+        if match:
+            sql = ("SELECT e.id, e.subject, e.snippet, e.sender, e.date, e.category, e.analysis,"
+                   " snippet(emails_fts, 1, '[', ']', '…', 12)"
+                   " FROM emails_fts JOIN emails e ON e.rowid = emails_fts.rowid"
+                   f" WHERE {' AND '.join(where)} ORDER BY bm25(emails_fts, 4.0, 1.0, 2.0, 1.0), e.date DESC")
+        else:
+            sql = ("SELECT e.id, e.subject, e.snippet, e.sender, e.date, e.category, e.analysis, NULL FROM emails e"
+                   + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY e.date DESC")
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "id": r[0], "subject": r[1], "snippet": r[2], "sender": r[3],
+                "date": datetime.datetime.fromtimestamp(r[4]).isoformat(timespec="seconds") if r[4] else None,
+                "category": r[5], "analysis": r[6], "highlight": r[7],
+            }
+            for r in rows
+        ]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> EmailSearchIndex:
+    """Process-wide index, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EmailSearchIndex()
+        return _index
+
+
+def index_scan_results(emails: List[EmailRecord], results: List[ScanResult]) -> int:
+    """Best-effort indexing from the scan pipeline; a broken index never fails a scan."""
+    if not INDEX_PATH:
+        return 0
+    try:
+        return get_index().upsert(zip(emails, results))
+    except sqlite3.Error as e:
+        print(f"[search_index] indexing failed: {e}")
+        return 0
+
+
+search_bp = Blueprint("search", __name__)
+
+
+@search_bp.route("/api/search")
+def search_emails():
+    """
+    Query params: q (free text), category (comma-separated), since / until (YYYY-MM-DD,
+    inclusive), limit, offset. Answers from the local index only.
+    """
+    args = request.args
+    categories = [c.strip().upper() for c in args.get("category", "").split(",") if c.strip()]
+    unknown = [c for c in categories if c not in Category.__members__]
+    if unknown:
+        return jsonify({"error": f"unknown category: {', '.join(unknown)}"}), 400
+    try:
+        since = parse_day(args.get("since"))
+        until = parse_day(args.get("until"), end_of_day=True)
+        limit = max(1, min(MAX_LIMIT, int(args.get("limit", 20))))
+        offset = max(0, int(args.get("offset", 0)))
+    except ValueError as e:
+        return jsonify({"error": f"bad parameter: {e}"}), 400
+
+    start = time.perf_counter()
+    results = get_index().search(args.get("q", ""), categories, since, until, limit, offset)
+    return jsonify({
+        "results": results,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+    })
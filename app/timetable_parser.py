@@ -53,6 +53,9 @@ import pdfplumber
 from datetime import datetime, timedelta
 import re
 
+from app.records import EventType, TimetableEvent, merge_intervals, strip_leading_weekday
+from app.metrics import DATE_PARSE_SECONDS, PDF_PAGE_SECONDS, PDF_PAGES
+
 
 
 def parse_pdf_timetable(pdf_path):
@@ -61,13 +64,17 @@ def parse_pdf_timetable(pdf_path):
     Expected format:
     Date | Day | Event
     e.g. 19-Sep-2025 Friday Mid-Sem Exam - Mathematics
+    Ranges such as "Diwali Break 20-Oct-2025 to 26-Oct-2025" become one multi-day entry.
+    Returns a list of TimetableEvent records sorted by date.
     """
     events = []
     text = ""
 
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
-            page_text = page.extract_text()
+            with PDF_PAGE_SECONDS.labels(engine="pdfplumber").time():
+                page_text = page.extract_text()
+            PDF_PAGES.labels(engine="pdfplumber", source="extracted").inc()
             if page_text:
                 text += page_text + "\n"
 
@@ -79,6 +86,10 @@ def parse_pdf_timetable(pdf_path):
 
     # Now we’ll adjust the pattern after checking these lines
     date_pattern = re.compile(r"(\d{2}-[A-Za-z]{3}-\d{4})")
+    range_pattern = re.compile(
+        r"(\d{2}-[A-Za-z]{3}-\d{4})\s*(?:to|till|until|–|—|-)\s*(\d{2}-[A-Za-z]{3}-\d{4})",
+        re.IGNORECASE
+    )
 
     lines = text.splitlines()
     for line in lines:
@@ -86,32 +97,53 @@ def parse_pdf_timetable(pdf_path):
         if match:
             date_str = match.group(1)
             try:
-                date = datetime.strptime(date_str, "%d-%b-%Y")
+                with DATE_PARSE_SECONDS.labels(engine="pdfplumber").time():
+                    date = datetime.strptime(date_str, "%d-%b-%Y")
             except ValueError:
                 continue
 
+            end_day = None
+            title = line.split(match.group(1))[-1].strip()
+            range_match = range_pattern.search(line)
+            if range_match:
+                try:
+                    end = datetime.strptime(range_match.group(2), "%d-%b-%Y")
+                except ValueError:
+                    end = None
+                if end and end > date:
+                    end_day = end.toordinal()
+                    # the title usually sits before the range ("Diwali Break 20-Oct-2025 to ...")
+                    title = f"{line[:range_match.start()]} {line[range_match.end():]}".strip(" -:,.")
+            title = strip_leading_weekday(title)
+
             if "Exam" in line:
-                event_type = "Exam"
-            elif "Holiday" in line:
-                event_type = "Holiday"
+                event_type = EventType.EXAM
+            elif "Holiday" in line or "Break" in line or "Vacation" in line:
+                event_type = EventType.HOLIDAY
             else:
-                event_type = "Other"
+                event_type = EventType.OTHER
 
-            events.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "event": line.split(match.group(1))[-1].strip(),
-                "type": event_type
-            })
+            events.append(TimetableEvent(
+                day=date.toordinal(),
+                title=title,
+                type=event_type,
+                raw_line=line,
+                end_day=end_day
+            ))
 
-    return events
+    # fold consecutive same-titled days into intervals
+    return merge_intervals(events)
 
 
 def extract_timetable_info(events):
     """
-    Builds a readable summary from the extracted events.
+    Builds a readable summary from the extracted TimetableEvent records.
     """
-    exams = [f"{e['date']} — {e['event']}" for e in events if e['type'] == 'Exam']
-    holidays = [f"{e['date']} — {e['event']}" for e in events if e['type'] == 'Holiday']
+    def when(e):
+        return f"{e.date_iso} to {e.end_date_iso}" if e.is_range else e.date_iso
+
+    exams = [f"{when(e)} — {e.title}" for e in events if e.type is EventType.EXAM]
+    holidays = [f"{when(e)} — {e.title}" for e in events if e.type is EventType.HOLIDAY]
 
     return {
         "exams": exams,
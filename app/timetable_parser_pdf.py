@@ -1,12 +1,21 @@
 # app/timetable_parser_pdf.py
+import hashlib
+import os
 import re
+from dataclasses import dataclass
 import fitz  # PyMuPDF
 from dateutil import parser as dateparser
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import datetime
 
+from app.lru import LRUCache
+from app.records import EventType, TimetableEvent, merge_intervals, strip_leading_weekday
+from app.metrics import DATE_PARSE_SECONDS, PDF_PAGE_SECONDS, PDF_PAGES
+
 # Patterns for dates (will be passed to dateutil for parsing)
 DATE_REGEXES = [
+    # 20-Oct-2025 or 20 Oct 2025 (before the looser month pattern so the day/year stay attached)
+    r"\b\d{1,2}[\-\s](?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*[\-\s,]+\d{4}\b",
     # dd/mm/yyyy or dd-mm-yyyy or d/m/yy
     r"\b\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}\b",
     # 12 March 2025 or March 12, 2025
@@ -15,6 +24,19 @@ DATE_REGEXES = [
     r"\b\d{4}[\/\-]\d{1,2}[\/\-]\d{1,2}\b"
 ]
 
+# A concrete date on either side of a range: "20-Oct-2025 to 26-Oct-2025", "20/10/2025 - 26/10/2025"
+_RANGE_DATE = (
+    r"(?:\d{1,2}[\-\s](?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*[\-\s,]+\d{4}"
+    r"|\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}"
+    r"|\d{4}[\/\-]\d{1,2}[\/\-]\d{1,2})"
+)
+DATE_RANGE_REGEX = re.compile(
+    rf"\b({_RANGE_DATE})(?:\s*(?:to|till|until|through|–|—)\s*|\s+-\s+)({_RANGE_DATE})\b",
+    re.IGNORECASE
+)
+# longest span accepted as a single interval (a semester-long "break" is a parse error)
+MAX_RANGE_DAYS = 120
+
 # Lowercased keywords indicating exam/holiday lines
 EXAM_KEYWORDS = ["exam", "test", "midterm", "final", "endsem", "end sem", "end-sem", "semester exam"]
 HOLIDAY_KEYWORDS = ["holiday", "vacation", "break", "off", "no class", "public holiday", "festive", "recess"]
@@ -24,7 +46,9 @@ def extract_text_from_pdf_bytes(file_bytes: bytes) -> str:
     doc = fitz.open(stream=file_bytes, filetype="pdf")
     all_text = []
     for page in doc:
-        page_text = page.get_text("text")
+        with PDF_PAGE_SECONDS.labels(engine="pymupdf").time():
+            page_text = page.get_text("text")
+        PDF_PAGES.labels(engine="pymupdf", source="extracted").inc()
         if page_text:
             all_text.append(page_text)
     doc.close()
@@ -41,8 +65,12 @@ def find_dates_in_line(line: str) -> List[str]:
                 found.append(s)
     return list(dict.fromkeys(found))  # deduplicate preserving order
 
-def try_parse_date(s: str) -> str:
-    """Try to parse a date-like string into ISO format YYYY-MM-DD. Returns None on failure."""
+def try_parse_date(s: str) -> Optional[int]:
+    """Try to parse a date-like string into a date ordinal. Returns None on failure."""
+    with DATE_PARSE_SECONDS.labels(engine="pymupdf").time():
+        return _parse_date(s)
+
+def _parse_date(s: str) -> Optional[int]:
     try:
         # dateutil parser is flexible — prefer dayfirst try if ambiguous with slashes
         if re.match(r"^\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4}$", s):
@@ -51,29 +79,55 @@ def try_parse_date(s: str) -> str:
         else:
             dt = dateparser.parse(s, fuzzy=True)
         if isinstance(dt, datetime.datetime):
-            return dt.date().isoformat()
+            return dt.date().toordinal()
         elif isinstance(dt, datetime.date):
-            return dt.isoformat()
+            return dt.toordinal()
     except Exception:
         return None
     return None
 
-def parse_timetable_text(text: str) -> Dict[str, List[Dict]]:
+def find_date_range(line: str) -> Optional[Tuple[int, int, str]]:
+    """Return (start ordinal, end ordinal, matched text) for a date range in the line, if any."""
+    m = DATE_RANGE_REGEX.search(line)
+    if not m:
+        return None
+    start = try_parse_date(m.group(1))
+    end = try_parse_date(m.group(2))
+    if start is None or end is None or not (0 < end - start <= MAX_RANGE_DAYS):
+        return None
+    return start, end, m.group(0)
+
+def parse_timetable_text(text: str) -> Dict[str, List[TimetableEvent]]:
     """
     Heuristic parser:
     - Scans text line-by-line
     - If a line contains exam keywords, find candidate dates in the same line (or nearby)
       and treat as exam entries (subject is remaining words)
     - If a line contains holiday keywords, same for holidays
-    Returns: {"exams": [...], "holidays": [...]}
-    Each entry: {"date": "YYYY-MM-DD", "subject": "...", "reason": "...", "raw_line": "..."}
+    - "X to Y" date ranges become one multi-day entry, and consecutive same-titled
+      days are merged into intervals
+    Returns: {"exams": [...], "holidays": [...]} of TimetableEvent records
+    (title is the exam subject / holiday reason; see records.timetable_text_to_json)
+    """
+    lines = split_lines(text)
+    exams, holidays = scan_lines(lines)
+    return finalize_entries(exams, holidays)
+
+def split_lines(text: str) -> List[str]:
+    return [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+def scan_lines(lines: List[str], start: int = 0, stop: int = None) -> Tuple[List[TimetableEvent], List[TimetableEvent]]:
+    """
+    Emit raw (undeduplicated) exam and holiday entries for lines[start:stop].
+    Lines outside that window are only used as look-ahead/look-back context.
     """
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     exams = []
     holidays = []
     n = len(lines)
+    stop = n if stop is None else stop
 
-    for i, line in enumerate(lines):
+    for i in range(start, stop):
+        line = lines[i]
         low = line.lower()
 
         # Check for explicit exam keywords
@@ -81,92 +135,270 @@ def parse_timetable_text(text: str) -> Dict[str, List[Dict]]:
             # look for date in this line first
             date_candidates = find_dates_in_line(line)
             parsed_date = None
-            parsed_date_iso = None
-            if date_candidates:
+            parsed_day = None
+            end_day = None
+            subject = line
+            date_range = find_date_range(line)
+            if date_range:
+                parsed_day, end_day, parsed_date = date_range
+                subject = subject.replace(parsed_date, "")
+            elif date_candidates:
                 for dc in date_candidates:
                     pd = try_parse_date(dc)
                     if pd:
-                        parsed_date_iso = pd
+                        parsed_day = pd
                         parsed_date = dc
                         break
             # if not found, look ahead a few lines
-            if not parsed_date_iso:
+            if not parsed_day:
                 for j in range(i+1, min(i+4, n)):
                     dcands = find_dates_in_line(lines[j])
                     for dc in dcands:
                         pd = try_parse_date(dc)
                         if pd:
-                            parsed_date_iso = pd
+                            parsed_day = pd
                             parsed_date = dc
                             break
-                    if parsed_date_iso:
+                    if parsed_day:
                         break
 
-            subject = line
             # clean subject by removing date substrings found
             for dc in date_candidates:
                 subject = subject.replace(dc, "")
-            subject = re.sub(r'\s{2,}', ' ', subject).strip(" -:,.")
-            exams.append({
-                "date": parsed_date_iso if parsed_date_iso else None,
-                "subject": subject,
-                "raw_line": line
-            })
+            subject = strip_leading_weekday(re.sub(r'\s{2,}', ' ', subject).strip(" -:,."))
+            exams.append(TimetableEvent(parsed_day, subject, EventType.EXAM, line, end_day))
             continue
 
         # Check for holidays
         if any(k in low for k in HOLIDAY_KEYWORDS):
             date_candidates = find_dates_in_line(line)
-            parsed_date_iso = None
+            parsed_day = None
             parsed_date = None
-            if date_candidates:
+            end_day = None
+            reason = line
+            date_range = find_date_range(line)
+            if date_range:
+                parsed_day, end_day, parsed_date = date_range
+                reason = reason.replace(parsed_date, "")
+            elif date_candidates:
                 for dc in date_candidates:
                     pd = try_parse_date(dc)
                     if pd:
-                        parsed_date_iso = pd
+                        parsed_day = pd
                         parsed_date = dc
                         break
             # also look ahead/back for possible date lines
-            if not parsed_date_iso:
+            if not parsed_day:
                 # look back up to 2 lines
                 for j in range(max(0, i-2), i):
                     dcands = find_dates_in_line(lines[j])
                     for dc in dcands:
                         pd = try_parse_date(dc)
                         if pd:
-                            parsed_date_iso = pd
+                            parsed_day = pd
                             parsed_date = dc
                             break
-                    if parsed_date_iso:
+                    if parsed_day:
                         break
-            reason = line
             for dc in date_candidates:
                 reason = reason.replace(dc, "")
-            reason = re.sub(r'\s{2,}', ' ', reason).strip(" -:,.")
-            holidays.append({
-                "date": parsed_date_iso if parsed_date_iso else None,
-                "reason": reason or None,
-                "raw_line": line
-            })
+            reason = strip_leading_weekday(re.sub(r'\s{2,}', ' ', reason).strip(" -:,."))
+            holidays.append(TimetableEvent(parsed_day, reason, EventType.HOLIDAY, line, end_day))
             continue
 
-    # Postprocess: remove duplicates by date+subject/reason
-    def dedup_entries(entries: List[Dict], key_fields: Tuple[str] = ("date", "subject")):
+    return exams, holidays
+
+def finalize_entries(exams: List[TimetableEvent], holidays: List[TimetableEvent]) -> Dict[str, List[TimetableEvent]]:
+    """Postprocess raw entries: remove duplicates by date+subject/reason, then merge intervals."""
+    def dedup_entries(entries: List[TimetableEvent]):
         seen = set()
         out = []
         for e in entries:
-            key = tuple(e.get(k) for k in key_fields)
+            key = (e.day, e.end_day, e.title)
             if key in seen:
                 continue
             seen.add(key)
             out.append(e)
         return out
 
-    exams = dedup_entries(exams, ("date", "subject"))
-    holidays = dedup_entries(holidays, ("date", "reason"))
+    exams = merge_intervals(dedup_entries(exams))
+    holidays = merge_intervals(dedup_entries(holidays))
     return {"exams": exams, "holidays": holidays}
 
+# --- page-fingerprint incremental parsing ----------------------------------
+#
+# Reissued calendars usually differ in a handful of pages. Each page is keyed by a
+# hash of its content streams and everything its resources reference (fonts, Form
+# XObjects, ...), which is much cheaper to compute than running text extraction. Extracted lines are cached per page fingerprint, and the
+# entries scanned from a page are cached per (fingerprint + neighbouring context
+# lines), because scan_lines looks a few lines across page boundaries.
+
+PAGE_CACHE_SIZE = int(os.environ.get("TIMETABLE_PAGE_CACHE_SIZE", "20000"))
+DOC_VERSIONS_SIZE = int(os.environ.get("TIMETABLE_DOC_VERSIONS_SIZE", "1000"))
+# scan_lines looks ahead up to 3 lines for exam dates and back up to 2 for holidays
+_LOOKAHEAD = 3
+_LOOKBACK = 2
+
+
+_page_lines = LRUCache(PAGE_CACHE_SIZE)      # page fingerprint -> tuple of lines
+_page_entries = LRUCache(PAGE_CACHE_SIZE)    # context key -> (exams, holidays) tuples
+_doc_versions = LRUCache(DOC_VERSIONS_SIZE)  # doc_key -> (page fingerprints, entry set)
+
+
+@dataclass(frozen=True, slots=True)
+class PageChangeReport:
+    """What changed since the previous upload of the same document key."""
+    pages_total: int
+    pages_reparsed: Tuple[int, ...]   # 1-based pages that missed the cache this time
+    pages_changed: Tuple[int, ...]    # 1-based pages whose fingerprint differs from the last version
+    pages_removed: int
+    entries_added: Tuple[TimetableEvent, ...]
+    entries_removed: Tuple[TimetableEvent, ...]
+
+    def to_dict(self) -> Dict:
+        return {
+            "pages_total": self.pages_total,
+            "pages_reparsed": list(self.pages_reparsed),
+            "pages_changed": list(self.pages_changed),
+            "pages_removed": self.pages_removed,
+            "entries_added": [e.to_dict() for e in self.entries_added],
+            "entries_removed": [e.to_dict() for e in self.entries_removed],
+        }
+
+
+_OBJ_REF = re.compile(r"(\d+)\s+(\d+)\s+R\b")
+# back-references to the page tree / owning page; following them would pull the whole document in
+_BACK_REF = re.compile(r"/(?:Parent|P)\s+\d+\s+\d+\s+R\b")
+
+
+def _object_digest(doc, xref: int, memo: Dict[int, bytes], active: set) -> bytes:
+    """
+    Merkle hash of a PDF object: its source with every indirect reference replaced
+    by the referenced object's digest, plus its raw stream. Object numbers never
+    enter the hash, so an unchanged page keeps its fingerprint when a reissued file
+    renumbers objects.
+    """
+    if xref in memo:
+        return memo[xref]
+    if xref in active:
+        return b"<cycle>"
+    active.add(xref)
+    src = _BACK_REF.sub("", doc.xref_object(xref, compressed=True))
+    h = hashlib.sha1()
+    pos = 0
+    for m in _OBJ_REF.finditer(src):
+        h.update(src[pos:m.start()].encode())
+        h.update(_object_digest(doc, int(m.group(1)), memo, active))
+        pos = m.end()
+    h.update(src[pos:].encode())
+    if doc.xref_is_stream(xref):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    active.discard(xref)
+    memo[xref] = h.digest()
+    return memo[xref]
+
+
+def page_fingerprint(page, memo: Dict[int, bytes] = None) -> str:
+    """
+    Hash of everything a PyMuPDF page draws from: content streams and, recursively,
+    its resources (fonts, images, Form XObjects and whatever those reference).
+    `memo` shares digests of objects used by several pages of one document.
+    """
+    memo = {} if memo is None else memo
+    return _object_digest(page.parent, page.xref, memo, set()).hex()
+
+def _context_before(pages_lines: List[Tuple[str, ...]], i: int) -> Tuple[str, ...]:
+    out = []
+    j = i - 1
+    while j >= 0 and len(out) < _LOOKBACK:
+        out = list(pages_lines[j][-(_LOOKBACK - len(out)):]) + out
+        j -= 1
+    return tuple(out)
+
+def _context_after(pages_lines: List[Tuple[str, ...]], i: int) -> Tuple[str, ...]:
+    out = []
+    j = i + 1
+    while j < len(pages_lines) and len(out) < _LOOKAHEAD:
+        out.extend(pages_lines[j][:_LOOKAHEAD - len(out)])
+        j += 1
+    return tuple(out)
+
+def _sort_key(e: TimetableEvent):
+    return (e.day is None, e.day or 0, e.title)
+
+def parse_timetable_pdf_incremental(file_bytes: bytes, doc_key: str = None) -> Tuple[Dict[str, List[TimetableEvent]], PageChangeReport]:
+    """
+    Parse PDF bytes, re-extracting and re-scanning only pages not seen before.
+    With a `doc_key` (e.g. the uploaded filename) the report lists the pages and
+    entries that differ from the previous upload under that key.
+    """
+    doc = fitz.open(stream=file_bytes, filetype="pdf")
+    fingerprints = []
+    pages_lines = []
+    reparsed = set()
+    try:
+        memo = {}
+        for pno, page in enumerate(doc):
+            fp = page_fingerprint(page, memo)
+            lines = _page_lines.get(fp)
+            if lines is None:
+                with PDF_PAGE_SECONDS.labels(engine="pymupdf").time():
+                    lines = tuple(split_lines(page.get_text("text") or ""))
+                _page_lines.put(fp, lines)
+                reparsed.add(pno + 1)
+                PDF_PAGES.labels(engine="pymupdf", source="extracted").inc()
+            else:
+                PDF_PAGES.labels(engine="pymupdf", source="cached").inc()
+            fingerprints.append(fp)
+            pages_lines.append(lines)
+    finally:
+        doc.close()
+
+    exams = []
+    holidays = []
+    for i, lines in enumerate(pages_lines):
+        before = _context_before(pages_lines, i)
+        after = _context_after(pages_lines, i)
+        key = hashlib.sha1("\x00".join((fingerprints[i],) + before + ("\x01",) + after).encode()).hexdigest()
+        entries = _page_entries.get(key)
+        if entries is None:
+            context = before + lines + after
+            page_exams, page_holidays = scan_lines(context, len(before), len(before) + len(lines))
+            entries = (tuple(page_exams), tuple(page_holidays))
+            _page_entries.put(key, entries)
+            reparsed.add(i + 1)
+        exams.extend(entries[0])
+        holidays.extend(entries[1])
+
+    parsed = finalize_entries(exams, holidays)
+    current = frozenset(parsed["exams"]) | frozenset(parsed["holidays"])
+
+    previous = _doc_versions.get(doc_key) if doc_key else None
+    if previous:
+        prev_fps, prev_entries = previous
+        changed = [i + 1 for i, fp in enumerate(fingerprints) if i >= len(prev_fps) or prev_fps[i] != fp]
+        pages_removed = max(0, len(prev_fps) - len(fingerprints))
+        added = current - prev_entries
+        removed = prev_entries - current
+    else:
+        changed = list(range(1, len(fingerprints) + 1))
+        pages_removed = 0
+        added = current
+        removed = frozenset()
+    if doc_key:
+        _doc_versions.put(doc_key, (tuple(fingerprints), current))
+
+    report = PageChangeReport(
+        pages_total=len(fingerprints),
+        pages_reparsed=tuple(sorted(reparsed)),
+        pages_changed=tuple(changed),
+        pages_removed=pages_removed,
+        entries_added=tuple(sorted(added, key=_sort_key)),
+        entries_removed=tuple(sorted(removed, key=_sort_key)),
+    )
+    return parsed, report
+
 # convenience: parse uploaded file bytes
-def parse_timetable_pdf_bytes(file_bytes: bytes) -> Dict[str, List[Dict]]:
-    text = extract_text_from_pdf_bytes(file_bytes)
-    return parse_timetable_text(text)
+def parse_timetable_pdf_bytes(file_bytes: bytes) -> Dict[str, List[TimetableEvent]]:
+    parsed, _ = parse_timetable_pdf_incremental(file_bytes)
+    return parsed
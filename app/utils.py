@@ -0,0 +1,95 @@
+# app/utils.py
+"""
+HTTP helpers for JSON API responses: fast serialization, strong ETags with
+conditional 304s, and gzip / brotli compression of large bodies.
+
+orjson and brotli are optional; without them the stdlib json encoder is used and
+only gzip is offered.
+"""
+import gzip
+import hashlib
+import json
+import os
+from typing import Any
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("JSON_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("JSON_GZIP_LEVEL", "6"))
+# dynamic responses: favour speed over the last few percent of ratio
+BROTLI_QUALITY = int(os.environ.get("JSON_BROTLI_QUALITY", "4"))
+# client-held tokens scope per-user state; short ones would be guessable
+CLIENT_TOKEN_MIN_LEN = 16
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def client_scoped_key(purpose: str, token: str, name: str = "") -> str:
+    """
+    Server-side key for state owned by whoever holds `token` (a random value the
+    client generates and keeps). Different tokens never share a key, and the key
+    reveals neither the token nor the name. Raises ValueError on a too-short token.
+    """
+    if not token or len(token) < CLIENT_TOKEN_MIN_LEN:
+        raise ValueError(f"token must be at least {CLIENT_TOKEN_MIN_LEN} characters")
+    return hashlib.sha256(f"{purpose}\x00{token}\x00{name}".encode("utf-8")).hexdigest()
+
+
+def content_etag(obj: Any) -> str:
+    """Strong entity tag (unquoted) over the JSON form of `obj`."""
+    data = obj if isinstance(obj, bytes) else dumps(obj)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _pick_encoding() -> str:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return ""
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """
+    Serialize `payload`, tagged with a strong ETag over the whole body.
+
+    A GET / HEAD whose If-None-Match holds the current tag gets a 304. Other
+    methods always get the full response: by the time it is built the request
+    has been carried out, and a 304 is only defined for GET / HEAD (RFC 9110
+    13.1.2). Each encoding gets its own tag (`<hash>`, `<hash>-gzip`,
+    `<hash>-br`); any of them in If-None-Match counts as a match, since they
+    share the same content.
+    """
+    body = dumps(payload)
+    base = content_etag(body)
+    encoding = _pick_encoding() if len(body) >= COMPRESS_MIN_BYTES else ""
+    etag = f"{base}-{encoding}" if encoding else base
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if (status == 200 and request.method in ("GET", "HEAD")
+            and any(request.if_none_match.contains(t) for t in (base, f"{base}-gzip", f"{base}-br"))):
+        return Response(status=304, headers=headers)
+
+    if encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, status=status, headers=headers, mimetype="application/json")
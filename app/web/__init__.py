@@ -1,8 +1,14 @@
 # app/web/__init__.py
 from flask import Flask
 from app.web.routes import web_bp
+from app.profiling import init_profiling
+from app.ics_feed import ics_bp
+from app.search_index import search_bp
 
 def create_app():
     app = Flask(__name__)
     app.register_blueprint(web_bp)
+    app.register_blueprint(ics_bp)
+    app.register_blueprint(search_bp)
+    init_profiling(app)
     return app
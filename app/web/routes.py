@@ -1,8 +1,13 @@
 import os
-from flask import Blueprint, render_template, jsonify, request
-from app.main import scan_and_flag
-from app.timetable_parser import parse_pdf_timetable, extract_timetable_info
-from app.calendar_client import CalendarClient
+from flask import Blueprint, render_template, jsonify, request, Response
+from app.main import last_scan, scan_and_flag, scan_payload
+from app.timetable_parser import extract_timetable_info
+from app.calendar_client import get_calendar_client
+from app.records import TimetableEvent, events_to_json
+from app.ics_feed import content_hash, feed_key, feed_store, feed_url
+from app.utils import client_scoped_key, json_response
+from app.timetable_parser_pdf import parse_timetable_pdf_incremental
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_prometheus
 
 web_bp = Blueprint(
     "web",
@@ -16,41 +21,81 @@ def home():
     return render_template("index.html")
 
 
+@web_bp.route("/api/health")
+def health():
+    return jsonify({"status": "ok"}), 200
+
+
+# Prometheus scrape endpoint; metrics are only formatted when scraped
+@web_bp.route("/metrics")
+def metrics():
+    return Response(render_prometheus(), content_type=METRICS_CONTENT_TYPE)
+
+
 @web_bp.route("/api/scan", methods=["POST"])
 def scan_inbox():
-    data = request.get_json(force=True)
+    data = request.get_json(silent=True) or {}
     max_messages = int(data.get("max_messages", 40))
 
     results, stats = scan_and_flag(max_messages=max_messages)
-    return jsonify({"results": results, "stats": stats})
+    return json_response(scan_payload(results, stats))
+
+
+# pollers revalidate the last scan with If-None-Match instead of re-running it
+@web_bp.route("/api/scan/latest", methods=["GET"])
+def latest_scan():
+    scan = last_scan()
+    if scan is None:
+        return jsonify({"error": "No scan has run yet"}), 404
+    return json_response(scan_payload(*scan))
 
 @web_bp.route("/api/upload_timetable", methods=["POST"])
 def upload_timetable():
+    """
+    multipart/form-data: 'file' (PDF) and optional 'doc_token' (random client-held
+    value, >= 16 chars). With a token the response also carries `changes`: pages and
+    entries that differ from this client's previous upload of the same filename, and
+    `feed_url` stays the same across re-uploads of that filename.
+
+    Entries come from the incremental PyMuPDF parser only, so `events` and `changes`
+    always agree and pages unchanged since an earlier upload are not re-extracted.
+    """
     try:
         file = request.files.get("file")
         if not file:
             return jsonify({"error": "No file uploaded"}), 400
+        doc_token = request.form.get("doc_token")
+        try:
+            doc_key = client_scoped_key("timetable-doc", doc_token, file.filename) if doc_token else None
+        except ValueError as e:
+            return jsonify({"error": f"Bad doc_token: {e}"}), 400
 
         os.makedirs("uploads", exist_ok=True)
         save_path = os.path.join("uploads", file.filename)
-        file.save(save_path)
+        file_bytes = file.read()
+        with open(save_path, "wb") as fh:
+            fh.write(file_bytes)
 
-        
-        events = parse_pdf_timetable(save_path)
-        print("[DEBUG] Parsed Events:", events)
-
-        
+        parsed, changes = parse_timetable_pdf_incremental(file_bytes, doc_key=doc_key)
+        events = sorted(parsed["exams"] + parsed["holidays"], key=lambda e: e.day or 0)
         summary = extract_timetable_info(events)
 
         if not events:
             return jsonify({"error": "No events found"}), 400
 
-        
-        return jsonify({
+        # with a token the feed URL stays the same across corrected re-uploads
+        feed = feed_store.publish(feed_key(file_bytes, doc_token, file.filename), events, name=file.filename,
+                                  version=content_hash(file_bytes))
+
+        payload = {
             "success": True,
             "summary": summary,
-            "events": events
-        })
+            "events": events_to_json(events),
+            "feed_url": feed_url(feed.key)
+        }
+        if doc_key:
+            payload["changes"] = changes.to_dict()
+        return json_response(payload)
 
     except Exception as e:
         import traceback
@@ -62,23 +107,27 @@ def upload_timetable():
 @web_bp.route("/api/add_events", methods=["POST"])
 def add_events_to_calendar():
     """
-    POST body: { "events": [ { "date": "YYYY-MM-DD", "event": "...", "type":"Exam" }, ... ],
+    POST body: { "events": [ { "date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "event": "...", "type":"Exam" }, ... ],
                  "reminder_minutes_before": 60 }
     """
     try:
         data = request.get_json(force=True)
-        events = data.get("events", [])
+        events = [TimetableEvent.from_dict(e) for e in data.get("events", [])]
         minutes_before = int(data.get("reminder_minutes_before", 60))
 
         if not events:
             return jsonify({"error": "No events provided"}), 400
 
-        cal = CalendarClient()
-        created = cal.create_events_from_timetable(parsed_events=events, reminders_minutes_before=minutes_before)
+        cal = get_calendar_client()
+        created, failed = cal.create_events_from_timetable(parsed_events=events, reminders_minutes_before=minutes_before)
 
-        
         summary = [{"id": c.get("id"), "htmlLink": c.get("htmlLink"), "summary": c.get("summary")} for c in created]
-        return jsonify({"success": True, "created": summary}), 200
+        # inserts are independent: report the ones that failed next to the ones already in the calendar
+        failures = [{"event": e.title, "date": e.date_iso, "error": str(err)} for e, err in failed]
+        body = {"success": not failures, "created": summary, "failed": failures}
+        if failures:
+            body["error"] = f"{len(failures)} of {len(failures) + len(created)} events could not be added"
+        return jsonify(body), 200 if created or not failures else 502
 
     except Exception as e:
         import traceback
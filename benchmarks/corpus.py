@@ -0,0 +1,85 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpora for the benchmark suite.
+
+Every generator takes a seed, so the same arguments always produce the same
+documents and the same ground truth.
+"""
+import datetime
+import random
+from typing import List, Set, Tuple
+
+from app.records import EmailRecord
+
+LINES_PER_PAGE = 40
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Data Structures", "Operating Systems",
+            "Signals and Systems", "Thermodynamics", "Economics", "Compiler Design", "Networks"]
+FESTIVALS = ["Diwali", "Holi", "Pongal", "Onam", "Eid", "Christmas", "Dussehra", "Republic Day"]
+BREAKS = ["Winter", "Summer", "Mid-Semester", "Puja", "Study"]
+
+# ground-truth keys: (type, start ISO date, end ISO date)
+TruthKey = Tuple[str, str, str]
+
+
+def _fmt(d: datetime.date) -> str:
+    return d.strftime("%d-%b-%Y")
+
+
+def timetable_lines(n_lines: int, seed: int = 7) -> Tuple[List[str], Set[TruthKey]]:
+    """Timetable-style lines plus the set of exam / holiday entries they encode."""
+    rng = random.Random(seed)
+    start = datetime.date(2025, 7, 1)
+    lines, truth = [], set()
+    for i in range(n_lines):
+        d = start + datetime.timedelta(days=rng.randrange(365))
+        weekday = d.strftime("%A")
+        roll = rng.random()
+        if roll < 0.35:
+            lines.append(f"{_fmt(d)} {weekday} Mid-Sem Exam - {rng.choice(SUBJECTS)} (Paper {i})")
+            truth.add(("Exam", d.isoformat(), d.isoformat()))
+        elif roll < 0.45:
+            lines.append(f"{_fmt(d)} {weekday} {rng.choice(FESTIVALS)} Holiday")
+            truth.add(("Holiday", d.isoformat(), d.isoformat()))
+        elif roll < 0.50:
+            end = d + datetime.timedelta(days=rng.randint(2, 14))
+            lines.append(f"{rng.choice(BREAKS)} Break {i} {_fmt(d)} to {_fmt(end)}")
+            truth.add(("Holiday", d.isoformat(), end.isoformat()))
+        else:
+            lines.append(f"{_fmt(d)} {weekday} Lecture - {rng.choice(SUBJECTS)} Unit {i % 9 + 1}")
+    return lines, truth
+
+
+def timetable_pdf(pages: int, seed: int = 7) -> Tuple[bytes, Set[TruthKey]]:
+    """A `pages`-page timetable PDF (PyMuPDF-generated) and its ground truth."""
+    import fitz
+
+    lines, truth = timetable_lines(pages * LINES_PER_PAGE, seed)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        y = 40
+        for line in lines[p * LINES_PER_PAGE:(p + 1) * LINES_PER_PAGE]:
+            page.insert_text((36, y), line, fontsize=9)
+            y += 18
+    data = doc.tobytes(garbage=0, deflate=True)
+    doc.close()
+    return data, truth
+
+
+def inbox(n: int, seed: int = 11) -> List[EmailRecord]:
+    """Synthetic inbox dump: roughly a third academic mail, the rest newsletters and noise."""
+    rng = random.Random(seed)
+    academic = ["Exam schedule for {s}", "Assignment deadline: {s}", "Internship interview slot",
+                "Project submission portal open", "Viva results for {s}"]
+    noise = ["Weekly newsletter", "Club fest registrations", "Cafeteria menu update",
+             "Library timings changed", "Sports meet photos"]
+    out = []
+    for i in range(n):
+        if rng.random() < 0.35:
+            subject = rng.choice(academic).format(s=rng.choice(SUBJECTS))
+        else:
+            subject = rng.choice(noise)
+        snippet = " ".join(rng.choice(["please", "note", "the", "details", "below", "campus", "students",
+                                       "week", "portal", "update", "reminder", "schedule"]) for _ in range(30))
+        out.append(EmailRecord(subject=subject, snippet=snippet, id=f"{i:012x}"))
+    return out
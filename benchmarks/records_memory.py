@@ -0,0 +1,58 @@
+# benchmarks/records_memory.py
+"""
+Per-record memory footprint of TimetableEvent records vs. the old dict shape.
+
+    python -m benchmarks.records_memory [--count 1000000]
+"""
+import argparse
+import datetime
+import gc
+import tracemalloc
+
+from app.records import EventType, TimetableEvent
+
+TITLES = ["Mid-Sem Exam - Mathematics", "End-Sem Exam - Physics", "Diwali Break", "Project Review"]
+TYPES = [EventType.EXAM, EventType.EXAM, EventType.HOLIDAY, EventType.OTHER]
+START = datetime.date(2025, 1, 1).toordinal()
+
+
+def make_dicts(n):
+    return [
+        {
+            "date": datetime.date.fromordinal(START + i % 365).strftime("%Y-%m-%d"),
+            "event": TITLES[i % 4],
+            "type": TYPES[i % 4].value,
+        }
+        for i in range(n)
+    ]
+
+
+def make_records(n):
+    return [TimetableEvent(START + i % 365, TITLES[i % 4], TYPES[i % 4]) for i in range(n)]
+
+
+def measure(factory, n):
+    """Return (bytes per record, total MiB) allocated while building `n` records."""
+    gc.collect()
+    tracemalloc.start()
+    objs = factory(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    gc.collect()
+    return current / n, current / (1024 * 1024)
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--count", type=int, default=1_000_000)
+    args = p.parse_args()
+
+    print(f"Synthetic events: {args.count:,}")
+    for name, factory in (("dict", make_dicts), ("TimetableEvent", make_records)):
+        per_record, total = measure(factory, args.count)
+        print(f"  {name:<16} {per_record:8.1f} B/record  {total:9.1f} MiB total")
+
+
+if __name__ == "__main__":
+    main()
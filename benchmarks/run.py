@@ -0,0 +1,241 @@
+# benchmarks/run.py
+"""
+Benchmark suite for the timetable parsers, the keyword prefilter and the scan
+pipeline, with JSON baselines for regression tracking.
+
+    python -m benchmarks.run                                # run and print
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --check benchmarks/baseline.json --threshold 0.25
+
+All inputs come from `benchmarks.corpus` (seeded, so every run sees the same
+documents). The scan pipeline runs against the offline stub Google server and
+fake LLM from `loadtest`, so no credentials or network are needed.
+
+`--check` exits non-zero when a case got slower than the baseline by more than
+`--threshold` (a fraction), or when an engine's entry recall dropped. Baselines
+are machine-specific: save them on the machine that runs the checks.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Set
+
+from benchmarks import corpus
+
+DEFAULT_SIZES = "1,50,500"
+# pdfplumber is one to two orders of magnitude slower; cap the pages it is given
+PDFPLUMBER_MAX_PAGES = 100
+RECALL_TOLERANCE = 0.005
+
+
+def measure(fn: Callable, repeat: int, setup: Callable = None) -> Dict:
+    """Median / min wall time of `fn()` over `repeat` runs, after one warm-up."""
+    if setup:
+        setup()
+    fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(times), "min_s": min(times), "runs": repeat}
+
+
+def _quiet(fn: Callable) -> Callable:
+    # parse_pdf_timetable prints its debug dump on every call
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def _clear_page_caches():
+    from app import timetable_parser_pdf as pdf
+
+    pdf._page_lines.clear()
+    pdf._page_entries.clear()
+    pdf._doc_versions.clear()
+
+
+# --- entry recall -----------------------------------------------------------
+
+def _keys_pymupdf(parsed) -> Set[corpus.TruthKey]:
+    return {(e.type.value, e.date_iso, e.end_date_iso)
+            for e in parsed["exams"] + parsed["holidays"]}
+
+
+def _keys_pdfplumber(events) -> Set[corpus.TruthKey]:
+    return {(e.type.value, e.date_iso, e.end_date_iso)
+            for e in events if e.type.value in ("Exam", "Holiday") and e.day is not None}
+
+
+def score(found: Set[corpus.TruthKey], truth: Set[corpus.TruthKey]) -> Dict:
+    hits = len(found & truth)
+    return {
+        "recall": round(hits / len(truth), 4) if truth else 1.0,
+        "precision": round(hits / len(found), 4) if found else 1.0,
+        "entries": len(found),
+        "expected": len(truth),
+    }
+
+
+# --- cases ------------------------------------------------------------------
+
+def bench_pdf(sizes: List[int], repeat: int, results: Dict, quality: Dict):
+    import pdfplumber
+
+    from app.timetable_parser import parse_pdf_timetable
+    from app.timetable_parser_pdf import extract_text_from_pdf_bytes, parse_timetable_pdf_bytes
+
+    for pages in sizes:
+        data, truth = corpus.timetable_pdf(pages)
+        reps = repeat if pages <= 50 else max(1, repeat // 3)
+        print(f"  timetable PDF: {pages} page(s), {len(data) / 1024:.0f} KiB, {len(truth)} expected entries")
+
+        results[f"extract.pymupdf.{pages}p"] = measure(lambda: extract_text_from_pdf_bytes(data), reps)
+        results[f"parse.pymupdf.{pages}p"] = measure(
+            lambda: parse_timetable_pdf_bytes(data), reps, setup=_clear_page_caches)
+        _clear_page_caches()
+        quality[f"pymupdf.{pages}p"] = score(_keys_pymupdf(parse_timetable_pdf_bytes(data)), truth)
+
+        if pages > PDFPLUMBER_MAX_PAGES:
+            continue
+
+        def plumber_extract():
+            with pdfplumber.open(io.BytesIO(data)) as pdf:
+                return [p.extract_text() for p in pdf.pages]
+
+        plumber_parse = _quiet(lambda: parse_pdf_timetable(io.BytesIO(data)))
+        results[f"extract.pdfplumber.{pages}p"] = measure(plumber_extract, reps)
+        results[f"parse.pdfplumber.{pages}p"] = measure(plumber_parse, reps)
+        quality[f"pdfplumber.{pages}p"] = score(_keys_pdfplumber(plumber_parse()), truth)
+
+
+def bench_text(repeat: int, results: Dict):
+    from app.timetable_parser_pdf import parse_timetable_text, try_parse_date
+
+    lines, _ = corpus.timetable_lines(20_000)
+    text = "\n".join(lines)
+    results["parse_timetable_text.20k_lines"] = measure(lambda: parse_timetable_text(text), repeat)
+
+    dates = [d.strftime(fmt) for d in (datetime.date(2025, 7, 1) + datetime.timedelta(days=i) for i in range(500))
+             for fmt in ("%d-%b-%Y", "%d/%m/%Y", "%d %B %Y", "%Y-%m-%d")]
+    results["date_parse.pymupdf.2k"] = measure(lambda: [try_parse_date(s) for s in dates], repeat)
+    results["date_parse.strptime.2k"] = measure(
+        lambda: [datetime.datetime.strptime(s, "%d-%b-%Y") for s in dates[::4]], repeat)
+
+
+def bench_scan(repeat: int, results: Dict, inbox_size: int, max_messages: int):
+    from loadtest.fakes import FakeChatGroq, install_offline_backends
+    from loadtest.stub_google import StubGoogleServer
+
+    stub = StubGoogleServer(inbox_size=inbox_size).start()
+    install_offline_backends(stub.base_url, FakeChatGroq())
+    from app.main import matches_keywords, scan_and_flag
+
+    emails = corpus.inbox(10_000)
+    results["keyword_filter.10k_emails"] = measure(lambda: [matches_keywords(e) for e in emails], repeat)
+    results[f"scan_pipeline.{max_messages}_msgs"] = measure(
+        _quiet(lambda: scan_and_flag(max_messages=max_messages)), repeat)
+    stub.stop()
+
+
+# --- baselines --------------------------------------------------------------
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Human-readable regressions of `current` against `baseline` (empty when clean)."""
+    problems = []
+    for name, base in baseline.get("results", {}).items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        ratio = now["median_s"] / base["median_s"] if base["median_s"] else 1.0
+        if ratio > 1 + threshold:
+            problems.append(f"{name}: {base['median_s'] * 1000:.2f}ms -> {now['median_s'] * 1000:.2f}ms "
+                            f"({(ratio - 1) * 100:+.0f}%, limit +{threshold * 100:.0f}%)")
+    for name, base in baseline.get("quality", {}).items():
+        now = current["quality"].get(name)
+        if now is not None and now["recall"] < base["recall"] - RECALL_TOLERANCE:
+            problems.append(f"{name}: recall {base['recall']:.3f} -> {now['recall']:.3f}")
+    return problems
+
+
+def print_report(report: Dict, baseline: Dict = None):
+    base_results = (baseline or {}).get("results", {})
+    print(f"\n{'case':<34} {'median':>11} {'min':>11} {'vs base':>9}")
+    for name, r in report["results"].items():
+        delta = ""
+        base = base_results.get(name)
+        if base and base["median_s"]:
+            delta = f"{(r['median_s'] / base['median_s'] - 1) * 100:+.0f}%"
+        print(f"{name:<34} {r['median_s'] * 1000:9.2f}ms {r['min_s'] * 1000:9.2f}ms {delta:>9}")
+
+    print(f"\n{'engine / size':<22} {'recall':>8} {'precision':>10} {'entries':>9} {'expected':>9}")
+    for name, q in report["quality"].items():
+        print(f"{name:<22} {q['recall']:8.3f} {q['precision']:10.3f} {q['entries']:9} {q['expected']:9}")
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Parser / prefilter / scan pipeline benchmarks")
+    p.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated timetable PDF page counts")
+    p.add_argument("--repeat", type=int, default=5, help="Timed runs per case (after one warm-up)")
+    p.add_argument("--only", default="pdf,text,scan", help="Comma-separated groups: pdf, text, scan")
+    p.add_argument("--inbox-size", type=int, default=500)
+    p.add_argument("--max-messages", type=int, default=200)
+    p.add_argument("--save-baseline", metavar="PATH", help="Write the results as the new baseline")
+    p.add_argument("--check", metavar="PATH", help="Compare against a baseline; exit 1 on regressions")
+    p.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction (0.25 = 25%%)")
+    args = p.parse_args(argv)
+
+    groups = set(args.only.split(","))
+    results, quality = {}, {}
+    if "pdf" in groups:
+        bench_pdf([int(s) for s in args.sizes.split(",") if s], args.repeat, results, quality)
+    if "text" in groups:
+        bench_text(args.repeat, results)
+    if "scan" in groups:
+        bench_scan(args.repeat, results, args.inbox_size, args.max_messages)
+
+    report = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+        "quality": quality,
+    }
+
+    baseline = None
+    if args.check:
+        with open(args.check, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        problems = compare(report, baseline, args.threshold)
+        if problems:
+            print("\n❌ Regressions against baseline:")
+            for line in problems:
+                print("  -", line)
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
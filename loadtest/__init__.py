@@ -0,0 +1,2 @@
+# loadtest/__init__.py
+"""Offline stand-ins for Gmail, Calendar and Groq, plus a concurrent load driver."""
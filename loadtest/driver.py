@@ -0,0 +1,197 @@
+# loadtest/driver.py
+"""
+Hermetic load test for the Flask endpoints: no Google OAuth, no Groq key, no network.
+
+Starts the stub Google server, swaps in the fake LLM, serves the real app on a
+local port and drives it with concurrent clients:
+
+    python -m loadtest.driver --endpoints scan,add_events,upload_timetable \
+        --requests 300 --concurrency 16 --google-latency-ms 40 --rate-limit-rate 0.02 \
+        --llm-delay-ms 150
+
+Prints p50/p95/p99 latency, throughput and status codes per endpoint.
+"""
+import argparse
+import io
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest.fakes import FakeChatGroq, install_offline_backends
+from loadtest.stub_google import StubGoogleServer
+
+ENDPOINTS = ("scan", "add_events", "upload_timetable")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def make_timetable_pdf(pages: int = 2) -> bytes:
+    import fitz  # PyMuPDF; only needed for the upload endpoint
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        y = 60
+        for d in range(1, 29):
+            page.insert_text((50, y), f"{d:02d}-Nov-2025 Friday Mid-Sem Exam - Subject {p}-{d}", fontsize=9)
+            y += 18
+        page.insert_text((50, y), "Diwali Break 20-Oct-2025 to 26-Oct-2025", fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def sample_events(n: int = 10):
+    return [{"date": f"2025-11-{d:02d}", "end_date": f"2025-11-{d:02d}", "event": f"Exam {d}", "type": "Exam"}
+            for d in range(1, n + 1)]
+
+
+class AppServer:
+    """Serve a Flask app with werkzeug's threaded server on a background thread."""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        from werkzeug.serving import make_server
+
+        self._server = make_server(host, port, app, threaded=True)
+        self.base_url = f"http://{host}:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="app-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+
+def run_load(base_url, endpoints, total_requests, concurrency, max_messages, events_per_request, pdf_pages):
+    import httpx
+
+    pdf_bytes = make_timetable_pdf(pdf_pages) if "upload_timetable" in endpoints else b""
+    events = sample_events(events_per_request)
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    lock = threading.Lock()
+    client = httpx.Client(base_url=base_url, timeout=120.0,
+                          limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency))
+
+    def one(i):
+        name = endpoints[i % len(endpoints)]
+        start = time.perf_counter()
+        try:
+            if name == "scan":
+                resp = client.post("/api/scan", json={"max_messages": max_messages})
+            elif name == "add_events":
+                resp = client.post("/api/add_events", json={"events": events, "reminder_minutes_before": 60})
+            else:
+                files = {"file": (f"timetable_{i % 8}.pdf", io.BytesIO(pdf_bytes), "application/pdf")}
+                resp = client.post("/api/upload_timetable", files=files)
+            status = str(resp.status_code)
+        except Exception as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+            statuses[name][status] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+    client.close()
+
+    report = {"wall_s": round(wall, 3), "throughput_rps": round(total_requests / wall, 2), "endpoints": {}}
+    for name in endpoints:
+        values = sorted(latencies[name])
+        report["endpoints"][name] = {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round((values[-1] if values else 0) * 1000, 1),
+            "rps": round(len(values) / wall, 2),
+            "status": dict(statuses[name]),
+        }
+    return report
+
+
+def print_report(report, stub_requests, llm_calls):
+    print(f"\n🚦 Load test: {report['throughput_rps']} req/s over {report['wall_s']}s")
+    print(f"  {'endpoint':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>9}  status")
+    for name, r in report["endpoints"].items():
+        print(f"  {name:<18}{r['requests']:>6}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['rps']:>9}  {r['status']}")
+    print(f"  stub google requests: {dict(stub_requests)}")
+    print(f"  fake LLM calls: {llm_calls}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Offline load test for the Flask endpoints")
+    p.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"comma-separated subset of {ENDPOINTS}")
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--max-messages", type=int, default=40, help="max_messages per /api/scan")
+    p.add_argument("--events", type=int, default=10, help="events per /api/add_events")
+    p.add_argument("--pdf-pages", type=int, default=2, help="pages in the uploaded timetable")
+    p.add_argument("--google-latency-ms", type=float, default=30.0)
+    p.add_argument("--google-jitter-ms", type=float, default=10.0)
+    p.add_argument("--error-rate", type=float, default=0.0, help="fraction of Google calls answering 503")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of Google calls answering 429")
+    p.add_argument("--llm-delay-ms", type=float, default=100.0)
+    p.add_argument("--llm-error-rate", type=float, default=0.0)
+    p.add_argument("--llm-cache", action="store_true", help="keep the classification cache (default: every call hits the LLM)")
+    p.add_argument("--json", help="also write the report to this JSON file")
+    args = p.parse_args(argv)
+
+    endpoints = tuple(e.strip() for e in args.endpoints.split(",") if e.strip())
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        p.error(f"unknown endpoints: {sorted(unknown)}")
+
+    stub = StubGoogleServer(latency_ms=args.google_latency_ms, jitter_ms=args.google_jitter_ms,
+                            error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate).start()
+    llm = FakeChatGroq(delay_ms=args.llm_delay_ms, error_rate=args.llm_error_rate)
+    install_offline_backends(stub.base_url, llm, llm_cache=args.llm_cache)
+
+    # imported only after the fakes are installed
+    from app.web import create_app
+
+    os.makedirs("uploads", exist_ok=True)
+    flask_app = create_app()
+    # per-request access logs and 500 tracebacks would drown the report; status codes are counted instead
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    flask_app.logger.setLevel(logging.CRITICAL)
+    server = AppServer(flask_app).start()
+    try:
+        # the app's debug prints would drown the report
+        devnull = open(os.devnull, "w")
+        real_stdout, sys.stdout = sys.stdout, devnull
+        try:
+            report = run_load(server.base_url, endpoints, args.requests, args.concurrency,
+                              args.max_messages, args.events, args.pdf_pages)
+        finally:
+            sys.stdout = real_stdout
+            devnull.close()
+    finally:
+        server.stop()
+        stub.stop()
+
+    print_report(report, stub.requests, llm.calls)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# loadtest/fakes.py
+"""
+Fake LLM and the wiring that points the app at offline backends.
+
+`install_offline_backends` must run before anything imports `app.agents.email_agent`
+(which builds a ChatGroq client at import time); the load driver calls it first.
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+
+FAKE_TOKEN = {
+    "token": "offline-access-token",
+    "refresh_token": "offline-refresh-token",
+    "client_id": "offline-client",
+    "client_secret": "offline-secret",
+    # far-future expiry so google-auth never tries to refresh against the network
+    "expiry": "2099-01-01T00:00:00Z",
+}
+
+
+class FakeChatGroq:
+    """Stand-in for ChatGroq.invoke with configurable delay and failure rate."""
+
+    def __init__(self, delay_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, seed: int = 99):
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt_text):
+        with self._lock:
+            self.calls += 1
+            delay = self.delay_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if fail:
+            raise RuntimeError("fake LLM: injected failure (rate_limit_exceeded)")
+
+        low = prompt_text.lower()
+        category = "IMPORTANT" if ("exam" in low or "deadline" in low or "interview" in low) else "POTENTIALLY_IMPORTANT"
+        content = json.dumps({"category": category, "summary": "Synthetic summary from the offline LLM."})
+        prompt_tokens = len(prompt_text) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+
+
+def write_fake_token(directory: str = None) -> str:
+    directory = directory or tempfile.mkdtemp(prefix="aura-offline-")
+    path = os.path.join(directory, "token.json")
+    with open(path, "w") as f:
+        json.dump(FAKE_TOKEN, f)
+    return path
+
+
+def install_offline_backends(google_base_url: str, llm: FakeChatGroq, llm_cache: bool = False) -> str:
+    """
+    Route Gmail/Calendar clients to `google_base_url`, swap the LLM for `llm`,
+    and lift token budgets so the run measures latency, not quota. The search
+    index and calendar feeds are written under the same temp directory as the
+    fake token, never to the working tree.
+    Returns the fake token path.
+    """
+    token_path = write_fake_token()
+    scratch = os.path.dirname(token_path)
+    index_path = os.path.join(scratch, "email_index.db")
+    feed_dir = os.path.join(scratch, "feeds")
+    os.environ["GOOGLE_TOKEN_PATH"] = token_path
+    os.environ["GOOGLE_CALENDAR_TOKEN_PATH"] = token_path
+    os.environ["GOOGLE_API_BASE_URL"] = google_base_url
+    os.environ["SEARCH_INDEX_PATH"] = index_path
+    os.environ["ICS_FEED_DIR"] = feed_dir
+    os.environ.setdefault("GROQ_API_KEY", "offline-fake-key")
+
+    import app.google_async as google_async
+    import app.calendar_client as calendar_client
+    import app.ics_feed as ics_feed
+    import app.search_index as search_index
+    import app.agents.email_agent as email_agent
+    from app.agents import token_budget
+
+    # module-level settings were read at import time; override them too
+    google_async.GOOGLE_API_BASE_URL = google_base_url
+    calendar_client.TOKEN_PATH = token_path
+    email_agent.llm = llm
+    search_index.INDEX_PATH = index_path
+    with search_index._index_lock:
+        if search_index._index is not None:
+            search_index._index.close()
+        search_index._index = search_index.EmailSearchIndex(index_path)
+    # routes hold a reference to the shared store, so redirect it rather than replace it
+    ics_feed.feed_store.directory = feed_dir
+
+    token_budget.daily_ledger.limit = 10 ** 12
+    token_budget.SCAN_TOKEN_BUDGET = 10 ** 9
+    if not llm_cache:
+        token_budget.classification_cache.maxsize = 0
+    return token_path
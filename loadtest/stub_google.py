@@ -0,0 +1,190 @@
+# loadtest/stub_google.py
+"""
+Local stub of the Gmail v1 / Calendar v3 REST endpoints used by app.google_async.
+
+Serves a deterministic synthetic inbox and an in-memory calendar, with
+configurable latency, 5xx error rate and 429 rate-limit rate:
+
+    server = StubGoogleServer(latency_ms=40, error_rate=0.01, rate_limit_rate=0.02)
+    server.start()            # server.base_url -> GOOGLE_API_BASE_URL
+    ...
+    server.stop()
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SUBJECTS = [
+    "Mid-sem exam schedule released",
+    "Assignment 3 submission deadline extended",
+    "Internship interview slot confirmation",
+    "Weekly campus newsletter",
+    "Project review meeting on Friday",
+    "Library books due reminder",
+    "Viva results announced",
+    "Club fest registrations open",
+]
+SNIPPET = ("Dear students, please find the details below. The {topic} is scheduled for next week; "
+           "check the portal for your slot and bring your ID card. Reply to this mail with questions.")
+
+_GMAIL_LIST = re.compile(r"^/gmail/v1/users/[^/]+/messages$")
+_GMAIL_SEND = re.compile(r"^/gmail/v1/users/[^/]+/messages/send$")
+_GMAIL_GET = re.compile(r"^/gmail/v1/users/[^/]+/messages/([^/]+)$")
+_CAL_EVENTS = re.compile(r"^/calendar/v3/calendars/[^/]+/events$")
+_CAL_EVENT = re.compile(r"^/calendar/v3/calendars/[^/]+/events/([^/]+)$")
+
+
+def synthetic_message(msg_id: str) -> dict:
+    """Deterministic Gmail message resource for `msg_id` (metadata format)."""
+    n = int(msg_id, 16) if re.fullmatch(r"[0-9a-f]+", msg_id) else hash(msg_id)
+    subject = SUBJECTS[n % len(SUBJECTS)]
+    return {
+        "id": msg_id,
+        "threadId": msg_id,
+        "snippet": SNIPPET.format(topic=subject.lower()),
+        # one message an hour going back from 13 Oct 2025 09:00 IST
+        "internalDate": str((1760326200 - n * 3600) * 1000),
+        "payload": {"headers": [
+            {"name": "Subject", "value": f"{subject} #{n}"},
+            {"name": "From", "value": f"office{n % 7}@college.example"},
+            {"name": "Date", "value": "Mon, 13 Oct 2025 09:00:00 +0530"},
+        ]},
+    }
+
+
+class StubGoogleServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 inbox_size: int = 500, seed: int = 1234):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.inbox = [f"{i:012x}" for i in range(1, inbox_size + 1)]
+        self.events = {}
+        self.requests = Counter()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubGoogleServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-google", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _fault(self):
+        """Sleep the configured latency, then maybe pick an injected failure status."""
+        with self._rng_lock:
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+            roll = self._rng.random()
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, obj, headers=None):
+                body = json.dumps(obj).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                n = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(n)) if n else {}
+
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                body = self._body() if method in ("POST", "PATCH") else None
+                op, handler = self._route(method, url.path)
+                stub.requests[op] += 1
+                if handler is None:
+                    return self._send(404, {"error": {"code": 404, "message": f"no stub for {method} {url.path}"}})
+                status = stub._fault()
+                if status == 429:
+                    stub.requests["429"] += 1
+                    return self._send(429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}},
+                                      {"Retry-After": "1"})
+                if status:
+                    stub.requests[str(status)] += 1
+                    return self._send(status, {"error": {"code": status, "message": "Backend Error"}})
+                self._send(200, handler(query, body))
+
+            def _route(self, method, path):
+                if method == "GET" and _GMAIL_LIST.match(path):
+                    return "gmail.list", self._gmail_list
+                if method == "POST" and _GMAIL_SEND.match(path):
+                    return "gmail.send", lambda q, b: {"id": f"sent{next(stub._ids)}", "labelIds": ["SENT"]}
+                m = _GMAIL_GET.match(path)
+                if method == "GET" and m:
+                    return "gmail.get", lambda q, b: synthetic_message(m.group(1))
+                if _CAL_EVENTS.match(path):
+                    if method == "GET":
+                        return "calendar.list", lambda q, b: {"items": list(stub.events.values())}
+                    if method == "POST":
+                        return "calendar.insert", self._calendar_insert
+                m = _CAL_EVENT.match(path)
+                if method == "PATCH" and m:
+                    return "calendar.patch", lambda q, b: self._calendar_patch(m.group(1), b)
+                return f"{method} {path}", None
+
+            def _gmail_list(self, query, body):
+                n = int(query.get("maxResults", ["50"])[0])
+                return {"messages": [{"id": i, "threadId": i} for i in stub.inbox[:n]],
+                        "resultSizeEstimate": len(stub.inbox)}
+
+            def _calendar_insert(self, query, body):
+                event_id = f"ev{next(stub._ids)}"
+                event = dict(body, id=event_id, htmlLink=f"https://calendar.example/event?eid={event_id}")
+                stub.events[event_id] = event
+                return event
+
+            def _calendar_patch(self, event_id, body):
+                event = stub.events.setdefault(event_id, {"id": event_id})
+                event.update(body)
+                return event
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+        return Handler
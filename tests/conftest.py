@@ -0,0 +1,44 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import fitz
+import pytest
+
+# app.agents.email_agent builds its ChatGroq client at import time; the tests never call it
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+# keep module-level stores out of the working tree
+_tmp = tempfile.mkdtemp(prefix="aura-tests-")
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(_tmp, "email_index.db"))
+os.environ.setdefault("ICS_FEED_DIR", os.path.join(_tmp, "feeds"))
+os.environ.setdefault("REMINDER_DB_PATH", os.path.join(_tmp, "reminders.db"))
+
+
+def build_pdf(*pages, fontsize=10):
+    """PDF bytes with one page per list of text lines."""
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for i, line in enumerate(lines):
+            page.insert_text((50, 60 + 18 * i), line, fontsize=fontsize)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture
+def make_pdf():
+    return build_pdf
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client for the live app, with uploads, feeds and version history kept per test."""
+    from app import timetable_parser_pdf as tp
+    from app.ics_feed import feed_store
+    from app.web import create_app
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(feed_store, "directory", str(tmp_path / "feeds"))
+    tp._doc_versions.clear()
+    return create_app().test_client()
@@ -0,0 +1,47 @@
+# tests/test_benchmarks.py
+import json
+
+from benchmarks import run
+
+
+def _report(median_s, recall=1.0):
+    return {"results": {"parse.pymupdf.50p": {"median_s": median_s, "min_s": median_s, "runs": 5}},
+            "quality": {"pymupdf.50p": {"recall": recall, "precision": 1.0, "entries": 10, "expected": 10}}}
+
+
+def test_compare_flags_slowdowns_past_the_threshold_only():
+    baseline = _report(0.100)
+    assert run.compare(_report(0.120), baseline, threshold=0.25) == []
+    [problem] = run.compare(_report(0.130), baseline, threshold=0.25)
+    assert problem.startswith("parse.pymupdf.50p: 100.00ms -> 130.00ms (+30%")
+
+
+def test_compare_flags_recall_drops_beyond_the_tolerance():
+    baseline = _report(0.100, recall=0.990)
+    assert run.compare(_report(0.100, recall=0.990 - run.RECALL_TOLERANCE / 2), baseline, threshold=0.25) == []
+    [problem] = run.compare(_report(0.100, recall=0.950), baseline, threshold=0.25)
+    assert problem == "pymupdf.50p: recall 0.990 -> 0.950"
+
+
+def test_compare_skips_cases_missing_on_either_side():
+    baseline = _report(0.100)
+    baseline["results"]["gone"] = {"median_s": 0.0, "min_s": 0.0, "runs": 1}
+    current = {"results": {"new": {"median_s": 9.0}}, "quality": {}}
+    assert run.compare(current, baseline, threshold=0.0) == []
+
+
+def test_saved_baseline_passes_its_own_check(tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    assert run.main(["--only", "pdf", "--sizes", "1", "--repeat", "1", "--save-baseline", path]) == 0
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert {"parse.pymupdf.1p", "parse.pdfplumber.1p"} <= saved["results"].keys()
+    assert saved["quality"]["pymupdf.1p"]["recall"] == 1.0
+
+    # timings on a shared machine are noisy; only the exit-code wiring is under test here
+    assert run.main(["--only", "pdf", "--sizes", "1", "--repeat", "1", "--check", path, "--threshold", "100"]) == 0
+    saved["quality"]["pymupdf.1p"]["recall"] = 2.0
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(saved, f)
+    assert run.main(["--only", "pdf", "--sizes", "1", "--repeat", "1", "--check", path, "--threshold", "100"]) == 1
+    assert "recall" in capsys.readouterr().out
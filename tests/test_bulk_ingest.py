@@ -0,0 +1,54 @@
+# tests/test_bulk_ingest.py
+import json
+import os
+
+from app import bulk_ingest
+
+
+def crashing_parse_file(path, sha256, engine, timeout):
+    """Stands in for parse_file in the workers: a file named crash*.pdf kills its worker."""
+    if os.path.basename(path).startswith("crash"):
+        os._exit(1)
+    return {"path": path, "sha256": sha256, "engine": engine, "bytes": os.path.getsize(path),
+            "status": "ok", "result": {"events": []}, "elapsed_s": 0.0}
+
+
+def _write_pdfs(directory, names):
+    for name in names:
+        (directory / name).write_bytes(f"%PDF-1.4 {name}".encode())
+
+
+def _records(out_path):
+    with open(out_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_worker_crash_only_fails_the_file_that_caused_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_ingest, "parse_file", crashing_parse_file)
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    _write_pdfs(drop, ["crash.pdf"] + [f"t{i}.pdf" for i in range(12)])
+    out = tmp_path / "out.jsonl"
+
+    stats = bulk_ingest.run_bulk(str(drop), str(out), workers=2)
+
+    status = {os.path.basename(r["path"]): r["status"] for r in _records(out)}
+    assert status.pop("crash.pdf") == "error"
+    assert status == {f"t{i}.pdf": "ok" for i in range(12)}
+    assert stats["ok"] == 12 and stats["error"] == 1
+    assert stats["pool_restarts"] >= 1
+
+
+def test_skip_set_is_per_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_ingest, "parse_file", crashing_parse_file)
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    _write_pdfs(drop, ["a.pdf", "b.pdf"])
+    out = tmp_path / "out.jsonl"
+
+    assert bulk_ingest.run_bulk(str(drop), str(out), workers=1, engine="pymupdf")["ok"] == 2
+    assert bulk_ingest.run_bulk(str(drop), str(out), workers=1, engine="pymupdf")["skipped"] == 2
+
+    stats = bulk_ingest.run_bulk(str(drop), str(out), workers=1, engine="pdfplumber")
+    assert stats["skipped"] == 0 and stats["ok"] == 2
+    assert {(r["engine"], r["status"]) for r in _records(out)} == {("pymupdf", "ok"), ("pdfplumber", "ok")}
@@ -0,0 +1,195 @@
+# tests/test_google_async.py
+import asyncio
+import email.utils
+import json
+import time
+
+import httpx
+import pytest
+from google.oauth2.credentials import Credentials
+
+from app import google_async
+from app.google_async import (AsyncCalendarClient, AsyncGmailClient, AsyncGoogleSession, GoogleAPIError,
+                              retry_delay, run_sync)
+from loadtest.fakes import FAKE_TOKEN, write_fake_token
+from loadtest.stub_google import StubGoogleServer
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    # the stub asks for Retry-After: 1; cap the waits so the suite stays quick
+    monkeypatch.setattr(google_async, "BACKOFF_MAX", 0.02)
+    monkeypatch.setattr(google_async, "RETRY_AFTER_MAX", 0.02)
+    server = StubGoogleServer(inbox_size=60, rate_limit_rate=0.3, error_rate=0.1).start()
+    yield server
+    server.stop()
+
+
+def _gmail(stub, max_retries):
+    session = AsyncGoogleSession(Credentials.from_authorized_user_info(FAKE_TOKEN), base_url=stub.base_url,
+                                 max_retries=max_retries)
+    return session, AsyncGmailClient(session)
+
+
+def test_rate_limited_and_failing_calls_are_retried(stub):
+    session, gmail = _gmail(stub, max_retries=10)
+    try:
+        messages = run_sync(gmail.fetch_messages(max_results=60))
+    finally:
+        run_sync(session.aclose())
+    assert [m["id"] for m in messages] == stub.inbox
+    assert stub.requests["429"] > 0 and stub.requests["503"] > 0
+
+
+def test_one_failing_message_does_not_abort_the_fetch(stub):
+    session, gmail = _gmail(stub, max_retries=0)
+
+    async def list_messages(query=None, max_results=50):
+        return [{"id": i} for i in stub.inbox[:max_results]]
+
+    gmail.list_messages = list_messages  # only the per-message gets hit injected faults
+    try:
+        messages = run_sync(gmail.fetch_messages(max_results=60))
+    finally:
+        run_sync(session.aclose())
+    ids = [m["id"] for m in messages]
+    assert 0 < len(ids) < 60
+    # survivors keep mailbox order
+    assert ids == [i for i in stub.inbox if i in set(ids)]
+
+
+def test_retry_delay_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(google_async, "BACKOFF_MAX", 2.0)
+    monkeypatch.setattr(google_async, "RETRY_AFTER_MAX", 120.0)
+    assert retry_delay(0, "3") == 3.0
+    later = email.utils.formatdate(time.time() + 5, usegmt=True)
+    assert 3.5 < retry_delay(0, later) <= 5.0
+    # the server's wait wins over the backoff cap, up to its own ceiling
+    assert retry_delay(0, "60") == 60.0
+    assert retry_delay(0, "600") == 120.0
+    assert 0.0 <= retry_delay(10) <= 2.0
+    assert 0.0 <= retry_delay(0, "not a date") <= 2.0
+
+
+def _mocked(handler, max_retries=2):
+    session = AsyncGoogleSession(Credentials.from_authorized_user_info(FAKE_TOKEN), max_retries=max_retries)
+    session._client = httpx.AsyncClient(base_url="https://google.test", transport=httpx.MockTransport(handler))
+    session._refresh_lock = asyncio.Lock()
+    return session
+
+
+def _flaky(error, failures=1):
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) <= failures:
+            raise error("boom", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    return handler, calls
+
+
+@pytest.mark.parametrize("method, error, retried", [
+    ("GET", httpx.ReadTimeout, True),
+    ("GET", httpx.RemoteProtocolError, True),
+    ("GET", httpx.ConnectError, True),
+    ("POST", httpx.ConnectError, True),
+    # the POST may already have been applied; retrying could insert it twice
+    ("POST", httpx.ReadTimeout, False),
+])
+def test_transport_errors_are_retried_when_safe(monkeypatch, method, error, retried):
+    monkeypatch.setattr(google_async, "BACKOFF_MAX", 0.001)
+    handler, calls = _flaky(error)
+    session = _mocked(handler)
+    try:
+        if retried:
+            assert run_sync(session.request(method, "/x")) == {"ok": True}
+        else:
+            with pytest.raises(error):
+                run_sync(session.request(method, "/x"))
+    finally:
+        run_sync(session.aclose())
+    assert len(calls) == (2 if retried else 1)
+
+
+def test_transport_errors_give_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(google_async, "BACKOFF_MAX", 0.001)
+    handler, calls = _flaky(httpx.ConnectTimeout, failures=10)
+    session = _mocked(handler, max_retries=2)
+    try:
+        with pytest.raises(httpx.ConnectTimeout):
+            run_sync(session.request("GET", "/x"))
+    finally:
+        run_sync(session.aclose())
+    assert len(calls) == 3
+
+
+def _calendar_handler(request):
+    body = json.loads(request.content)
+    if body["summary"].startswith("bad"):
+        return httpx.Response(400, json={"error": "invalid"})
+    return httpx.Response(200, json={"id": body["summary"], "summary": body["summary"]})
+
+
+def test_insert_events_reports_each_event(monkeypatch):
+    session = _mocked(_calendar_handler, max_retries=0)
+    calendar = AsyncCalendarClient(session)
+    try:
+        results = run_sync(calendar.insert_events([{"summary": s} for s in ("a", "bad-1", "b", "bad-2")]))
+    finally:
+        run_sync(session.aclose())
+    assert [r["id"] if isinstance(r, dict) else r.status_code for r in results] == ["a", 400, "b", 400]
+
+
+def test_all_messages_failing_raises(stub):
+    stub.error_rate = 1.0
+    session, gmail = _gmail(stub, max_retries=0)
+
+    async def list_messages(query=None, max_results=50):
+        return [{"id": i} for i in stub.inbox[:max_results]]
+
+    gmail.list_messages = list_messages
+    try:
+        with pytest.raises(GoogleAPIError):
+            run_sync(gmail.fetch_messages(max_results=5))
+    finally:
+        run_sync(session.aclose())
+
+
+def test_clients_are_shared_per_token_file():
+    from app.gmail_client import get_gmail_client
+
+    server = StubGoogleServer(inbox_size=10).start()
+    try:
+        token_path = write_fake_token()
+        a = get_gmail_client(token_path, base_url=server.base_url)
+        assert get_gmail_client(token_path, base_url=server.base_url) is a
+        assert get_gmail_client(write_fake_token(), base_url=server.base_url) is not a
+        assert len(a.fetch_messages(max_results=5)) == 5
+        assert len(a.fetch_messages(max_results=5)) == 5
+    finally:
+        server.stop()
+
+
+def test_add_events_reports_failed_inserts_next_to_created_ones(client, monkeypatch):
+    from app import calendar_client
+    from app.web import routes
+
+    monkeypatch.setattr(calendar_client, "TOKEN_PATH", write_fake_token())
+    cal = calendar_client.CalendarClient()
+    cal.aio.session = _mocked(_calendar_handler, max_retries=0)
+    monkeypatch.setattr(routes, "get_calendar_client", lambda: cal)
+
+    events = [{"date": "2025-09-19", "event": "Physics", "type": "Exam"},
+              {"date": "2025-09-22", "event": "bad row", "type": "Holiday"}]
+    try:
+        resp = client.post("/api/add_events", json={"events": events})
+    finally:
+        run_sync(cal.aio.session.aclose())
+    data = resp.get_json()
+    assert resp.status_code == 200
+    assert data["success"] is False
+    assert [c["summary"] for c in data["created"]] == ["Exam: Physics"]
+    assert [(f["event"], f["date"]) for f in data["failed"]] == [("bad row", "2025-09-22")]
+    assert "1 of 2" in data["error"]
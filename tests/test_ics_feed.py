@@ -0,0 +1,51 @@
+# tests/test_ics_feed.py
+import io
+import re
+
+from app.ics_feed import content_hash
+
+TOKEN = "alice-token-0123456789"
+
+
+def _upload(client, data, token=None):
+    form = {"file": (io.BytesIO(data), "timetable.pdf")}
+    if token:
+        form["doc_token"] = token
+    return client.post("/api/upload_timetable", data=form).get_json()
+
+
+def _vevents(body):
+    return dict(re.findall(r"UID:(\S+)\r\n.*?DTSTART;VALUE=DATE:(\d{8})", body, re.S))
+
+
+def test_corrected_timetable_keeps_its_feed_url_and_event_uids(client, make_pdf):
+    first = make_pdf(["19-Sep-2025 Friday Mid-Sem Exam - Physics", "20-Oct-2025 Monday Diwali Holiday"])
+    corrected = make_pdf(["22-Sep-2025 Monday Mid-Sem Exam - Physics", "20-Oct-2025 Monday Diwali Holiday"])
+
+    url = _upload(client, first, token=TOKEN)["feed_url"]
+    resp = client.get(url)
+    etag = resp.headers["ETag"]
+    before = _vevents(resp.get_data(as_text=True))
+    assert sorted(before.values()) == ["20250919", "20251020"]
+
+    assert _upload(client, corrected, token=TOKEN)["feed_url"] == url
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    after = _vevents(resp.get_data(as_text=True))
+    # same events, the exam moved in place
+    assert after.keys() == before.keys()
+    assert sorted(after.values()) == ["20250922", "20251020"]
+
+    assert client.get(url, headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+
+def test_feed_urls_are_per_client_and_content_addressed_without_a_token(client, make_pdf):
+    data = make_pdf(["19-Sep-2025 Friday Mid-Sem Exam - Physics"])
+    alice = _upload(client, data, token=TOKEN)["feed_url"]
+    bob = _upload(client, data, token="bob-token-0123456789ab")["feed_url"]
+    anonymous = _upload(client, data)["feed_url"]
+
+    assert alice != bob
+    assert anonymous == f"/api/calendar/{content_hash(data)}.ics"
+    assert TOKEN not in alice
@@ -0,0 +1,136 @@
+# tests/test_json_response.py
+import gzip
+import json
+
+import pytest
+from flask import Flask
+
+import app.main as main
+from app import utils
+from tests.test_scan_stats import FakeGmail, fake_analyze
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    calls = []
+
+    class CountingGmail(FakeGmail):
+        def fetch_messages(self, max_results=40):
+            calls.append(max_results)
+            return super().fetch_messages(max_results)
+
+    monkeypatch.setattr(main, "get_gmail_client", CountingGmail)
+    monkeypatch.setattr(main, "analyze_email", fake_analyze)
+    monkeypatch.setattr(main, "_last_scan", None)
+    return calls
+
+
+@pytest.fixture
+def echo_client():
+    app = Flask(__name__)
+
+    @app.route("/echo", methods=["GET", "POST"])
+    def echo():
+        return utils.json_response({"items": [{"id": i, "title": f"Exam {i}"} for i in range(100)]})
+
+    return app.test_client()
+
+
+def _plain(resp):
+    body = resp.get_data()
+    if resp.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def test_latest_scan_answers_304_to_a_matching_if_none_match(client, scans):
+    assert client.get("/api/scan/latest").status_code == 404
+
+    posted = client.post("/api/scan", json={"max_messages": 6})
+    latest = client.get("/api/scan/latest")
+    assert latest.status_code == 200
+    # the poller can reuse the tag it got from the POST
+    assert latest.headers["ETag"] == posted.headers["ETag"]
+    assert latest.get_json() == posted.get_json()
+
+    resp = client.get("/api/scan/latest", headers={"If-None-Match": latest.headers["ETag"]})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+    assert scans == [6]
+
+
+def test_post_ignores_if_none_match_and_always_returns_the_body(client, scans):
+    etag = client.post("/api/scan", json={"max_messages": 6}).headers["ETag"]
+
+    resp = client.post("/api/scan", json={"max_messages": 6}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == etag
+    assert len(resp.get_json()["results"]) == 6
+    assert scans == [6, 6]
+
+
+def test_get_no_longer_runs_a_scan(client, scans):
+    assert client.get("/api/scan").status_code == 405
+    assert scans == []
+
+
+def test_etag_covers_the_whole_body():
+    app = Flask(__name__)
+    with app.test_request_context():
+        a = utils.json_response({"results": [1], "stats": {"analysis": 1}})
+        b = utils.json_response({"results": [1], "stats": {"analysis": 2}})
+    assert a.headers["ETag"] != b.headers["ETag"]
+
+
+def test_gzip_is_negotiated_with_its_own_tag(echo_client):
+    identity = echo_client.get("/echo")
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["Vary"] == "Accept-Encoding"
+
+    resp = echo_client.get("/echo", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["ETag"] == identity.headers["ETag"][:-1] + '-gzip"'
+    assert _plain(resp) == identity.get_json()
+
+    # any variant of the same content revalidates
+    again = echo_client.get("/echo", headers={"Accept-Encoding": "gzip", "If-None-Match": identity.headers["ETag"]})
+    assert again.status_code == 304
+    posted = echo_client.post("/echo", headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["ETag"]})
+    assert posted.status_code == 200
+
+
+def test_brotli_is_preferred_when_available(echo_client):
+    brotli = pytest.importorskip("brotli")
+    resp = echo_client.get("/echo", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert resp.headers["ETag"].endswith('-br"')
+    assert json.loads(brotli.decompress(resp.get_data())) == _plain(echo_client.get("/echo"))
+
+
+def test_br_is_negotiated_ahead_of_gzip(echo_client, monkeypatch):
+    class FakeBrotli:
+        @staticmethod
+        def compress(data, quality):
+            return b"br:" + data
+
+    monkeypatch.setattr(utils, "brotli", FakeBrotli)
+    identity = echo_client.get("/echo")
+    resp = echo_client.get("/echo", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert resp.headers["ETag"] == identity.headers["ETag"][:-1] + '-br"'
+    assert resp.get_data() == b"br:" + identity.get_data()
+
+
+def test_brotli_only_client_gets_identity_without_brotli(echo_client, monkeypatch):
+    monkeypatch.setattr(utils, "brotli", None)
+    resp = echo_client.get("/echo", headers={"Accept-Encoding": "br"})
+    assert "Content-Encoding" not in resp.headers
+    assert len(resp.get_json()["items"]) == 100
+
+
+def test_small_bodies_are_not_compressed():
+    app = Flask(__name__)
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        resp = utils.json_response({"ok": True})
+    assert "Content-Encoding" not in resp.headers
+    assert len(resp.get_data()) < utils.COMPRESS_MIN_BYTES
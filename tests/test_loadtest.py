@@ -0,0 +1,71 @@
+# tests/test_loadtest.py
+import os
+
+import pytest
+
+from loadtest import driver
+from loadtest.fakes import FakeChatGroq, install_offline_backends
+from loadtest.stub_google import StubGoogleServer
+
+INSTALLED_ENV = ("GOOGLE_TOKEN_PATH", "GOOGLE_CALENDAR_TOKEN_PATH", "GOOGLE_API_BASE_URL", "SEARCH_INDEX_PATH",
+                 "ICS_FEED_DIR", "GROQ_API_KEY")
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """install_offline_backends, undone afterwards so later tests see the usual wiring."""
+    import app.agents.email_agent as email_agent
+    import app.calendar_client as calendar_client
+    import app.google_async as google_async
+    import app.ics_feed as ics_feed
+    import app.search_index as search_index
+    from app.agents import token_budget
+
+    for name in INSTALLED_ENV:
+        if name in os.environ:
+            monkeypatch.setenv(name, os.environ[name])
+        else:
+            monkeypatch.delenv(name, raising=False)
+    for obj, attr in [(google_async, "GOOGLE_API_BASE_URL"), (calendar_client, "TOKEN_PATH"), (email_agent, "llm"),
+                      (search_index, "INDEX_PATH"), (ics_feed.feed_store, "directory"),
+                      (token_budget.daily_ledger, "limit"), (token_budget, "SCAN_TOKEN_BUDGET"),
+                      (token_budget.classification_cache, "maxsize")]:
+        monkeypatch.setattr(obj, attr, getattr(obj, attr))
+    # install_offline_backends closes the open index; hand it none so the shared one survives
+    monkeypatch.setattr(search_index, "_index", None)
+    monkeypatch.chdir(tmp_path)
+
+    stub = StubGoogleServer(inbox_size=30).start()
+    llm = FakeChatGroq()
+    install_offline_backends(stub.base_url, llm)
+    yield stub, llm
+    stub.stop()
+    search_index._index.close()
+
+
+def test_offline_backends_serve_every_endpoint(offline):
+    stub, llm = offline
+    from app.web import create_app
+
+    os.makedirs("uploads", exist_ok=True)
+    server = driver.AppServer(create_app()).start()
+    try:
+        report = driver.run_load(server.base_url, driver.ENDPOINTS, total_requests=6, concurrency=3,
+                                 max_messages=10, events_per_request=3, pdf_pages=1)
+    finally:
+        server.stop()
+
+    for name in driver.ENDPOINTS:
+        assert report["endpoints"][name]["requests"] == 2
+        assert report["endpoints"][name]["status"] == {"200": 2}, name
+    # everything went to the stub and the fake LLM, nothing to the network
+    assert stub.requests and llm.calls > 0
+    assert len(stub.events) == 2 * 3
+
+
+def test_percentile_uses_the_nearest_rank():
+    values = [0.01 * i for i in range(1, 101)]
+    assert driver.percentile(values, 50) == values[49]
+    assert driver.percentile(values, 99) == values[98]
+    assert driver.percentile(values, 100) == values[-1]
+    assert driver.percentile([], 95) == 0.0
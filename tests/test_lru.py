@@ -0,0 +1,28 @@
+# tests/test_lru.py
+from app.lru import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a is now the most recent
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.values() == [1, 3]
+
+
+def test_peek_does_not_refresh_an_entry():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.peek("a") == 1
+    cache.put("c", 3)
+    assert cache.peek("a") is None
+    assert len(cache) == 2
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a", "miss") == "miss"
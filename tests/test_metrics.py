@@ -0,0 +1,85 @@
+# tests/test_metrics.py
+import re
+
+import pytest
+
+from app.metrics import CONTENT_TYPE, KEYWORD_FILTER_SECONDS, Counter, Gauge, Histogram, Registry
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{[a-zA-Z_]+="(?:[^"\\]|\\.)*"(,[a-zA-Z_]+="(?:[^"\\]|\\.)*")*\})? \S+$')
+
+
+def _registry(*metrics):
+    registry = Registry()
+    for m in metrics:
+        registry.register(m)
+    return registry
+
+
+def test_exposition_format():
+    requests = Counter("t_requests", "Requests.", ("path",))
+    depth = Gauge("t_depth", "Queue depth.")
+    latency = Histogram("t_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.labels(path='/a"b\\c\nd').inc()
+    depth.set(3)
+    latency.observe(0.5)
+
+    text = _registry(requests, depth, latency).render()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:3] == ["# HELP t_requests Requests.", "# TYPE t_requests counter",
+                         't_requests_total{path="/a\\"b\\\\c\\nd"} 1']
+    assert "# TYPE t_depth gauge" in lines and "t_depth 3" in lines
+    assert "# TYPE t_seconds histogram" in lines
+    for line in lines:
+        assert line.startswith("# ") or SAMPLE.match(line), line
+    assert "version=0.0.4" in CONTENT_TYPE
+
+
+def test_histogram_buckets_are_cumulative_per_label_set():
+    latency = Histogram("t_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.labels(op="list").observe(value)
+    latency.labels(op="get").observe(0.01)
+
+    lines = latency.render().splitlines()
+    assert lines[2:] == [
+        't_seconds_bucket{op="get",le="0.1"} 1',
+        't_seconds_bucket{op="get",le="1"} 1',
+        't_seconds_bucket{op="get",le="+Inf"} 1',
+        't_seconds_sum{op="get"} 0.01',
+        't_seconds_count{op="get"} 1',
+        # le is inclusive: 0.1 lands in the 0.1 bucket
+        't_seconds_bucket{op="list",le="0.1"} 2',
+        't_seconds_bucket{op="list",le="1"} 3',
+        't_seconds_bucket{op="list",le="+Inf"} 4',
+        't_seconds_sum{op="list"} 2.65',
+        't_seconds_count{op="list"} 4',
+    ]
+
+
+def test_labels_return_one_child_per_value_set():
+    calls = Counter("t_calls", "Calls.", ("model", "outcome"))
+    calls.labels(model="m", outcome="ok").inc()
+    calls.labels(outcome="ok", model="m").inc(2)
+    calls.labels(model="m", outcome="error").inc()
+    assert calls.render().splitlines()[2:] == [
+        't_calls_total{model="m",outcome="error"} 1',
+        't_calls_total{model="m",outcome="ok"} 3',
+    ]
+    with pytest.raises(KeyError):
+        calls.labels(model="m")
+
+
+def test_duplicate_names_are_rejected():
+    registry = _registry(Counter("t_dup", "One."))
+    with pytest.raises(ValueError):
+        registry.register(Gauge("t_dup", "Two."))
+
+
+def test_keyword_filter_buckets_resolve_microseconds():
+    child = Histogram("t_filter", "Filter.", buckets=KEYWORD_FILTER_SECONDS.buckets).labels()
+    for value in (0.0000015, 0.000002, 0.000004):
+        child.observe(value)
+    assert KEYWORD_FILTER_SECONDS.buckets[0] <= 0.000001
+    # a ~2us filter spreads over distinct buckets instead of piling into the first one
+    assert sum(1 for n in child.counts if n) == 2
@@ -0,0 +1,45 @@
+# tests/test_profiling.py
+import marshal
+
+import pytest
+
+PROFILE = {"X-Profile": "1"}
+
+
+@pytest.fixture
+def profiled(client):
+    client.application.config["PROFILING_ENABLED"] = True
+    resp = client.get("/api/health", headers=PROFILE)
+    return client, resp.headers["X-Profile-Id"]
+
+
+def test_profiles_are_listed_and_downloadable(profiled):
+    client, profile_id = profiled
+    [meta] = client.get("/api/profiles", headers=PROFILE).get_json()["profiles"]
+    assert (meta["id"], meta["path"], meta["status"]) == (profile_id, "/api/health", 200)
+
+    resp = client.get(f"/api/profiles/{profile_id}", headers=PROFILE)
+    assert resp.status_code == 200
+    assert isinstance(marshal.loads(resp.get_data()), dict)
+
+
+def test_text_report_honours_sort_and_limit(profiled):
+    client, profile_id = profiled
+    resp = client.get(f"/api/profiles/{profile_id}?format=text&sort=time&limit=3", headers=PROFILE)
+    assert resp.status_code == 200
+    assert "internal time" in resp.get_data(as_text=True)
+
+
+@pytest.mark.parametrize("query", ["sort=bogus", "sort=", "limit=abc", "limit=0", "limit=-5", "limit=2.5"])
+def test_bad_text_options_are_rejected(profiled, query):
+    client, profile_id = profiled
+    resp = client.get(f"/api/profiles/{profile_id}?format=text&{query}", headers=PROFILE)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+
+
+def test_endpoints_are_hidden_and_guarded(client):
+    assert client.get("/api/profiles", headers=PROFILE).status_code == 404
+    client.application.config["PROFILING_ENABLED"] = True
+    assert client.get("/api/profiles").status_code == 403
+    assert client.get("/api/profiles/nope", headers=PROFILE).status_code == 404
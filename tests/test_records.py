@@ -0,0 +1,84 @@
+# tests/test_records.py
+import datetime
+
+import pytest
+
+from app.records import (AnalysisSource, Category, EmailRecord, EventType, ScanResult, TimetableEvent,
+                         iso_to_ordinal, merge_intervals, strip_leading_weekday)
+
+
+def _day(iso):
+    return iso_to_ordinal(iso)
+
+
+def test_email_record_carries_its_receive_time():
+    received = datetime.datetime(2025, 10, 13, 9, 0).timestamp()
+    email = EmailRecord("Viva results", "Posted on the portal", id="m1", sender="office@college.example",
+                        timestamp=received)
+    assert email.to_dict() == {"id": "m1", "subject": "Viva results", "snippet": "Posted on the portal",
+                               "sender": "office@college.example", "timestamp": received}
+    assert EmailRecord("s", "b").timestamp == 0.0
+
+
+def test_records_are_frozen():
+    with pytest.raises(AttributeError):
+        EmailRecord("s", "b").subject = "x"
+
+
+def test_scan_result_serializes_enums_by_value():
+    result = ScanResult("s", "b", '{"category": "IMPORTANT"}', Category.IMPORTANT, AnalysisSource.CACHE)
+    assert result.to_dict()["category"] == "IMPORTANT"
+    assert result.to_dict()["source"] == "cache"
+    assert AnalysisSource.CACHE.is_llm_answer and not AnalysisSource.KEYWORD_ONLY.is_llm_answer
+
+
+@pytest.mark.parametrize("analysis, category", [
+    ('{"category": "POTENTIALLY_IMPORTANT"}', Category.POTENTIALLY_IMPORTANT),
+    ('{"category": "IMPORTANT"}', Category.IMPORTANT),
+    ("irrelevant? IRRELEVANT", Category.IRRELEVANT),
+    ("no idea", Category.UNKNOWN),
+    (None, Category.UNKNOWN),
+])
+def test_category_from_analysis(analysis, category):
+    assert Category.from_analysis(analysis) is category
+
+
+def test_timetable_event_round_trips_through_its_json_shape():
+    event = TimetableEvent(_day("2025-10-20"), "Diwali Break", EventType.HOLIDAY, end_day=_day("2025-10-24"))
+    d = event.to_dict()
+    assert d == {"date": "2025-10-20", "end_date": "2025-10-24", "event": "Diwali Break", "type": "Holiday"}
+    assert TimetableEvent.from_dict(d) == event
+    assert event.is_range and event.end_date == datetime.date(2025, 10, 24)
+
+
+def test_from_dict_tolerates_unknown_types_and_backwards_ranges():
+    event = TimetableEvent.from_dict({"date": "2025-10-20", "end_date": "2025-10-19", "event": "Fest", "type": "?"})
+    assert event.type is EventType.OTHER
+    assert event.end_day is None and not event.is_range
+
+
+def test_merge_intervals_joins_touching_days_only():
+    rows = [
+        TimetableEvent(_day("2025-11-06"), "Holiday", EventType.HOLIDAY),
+        TimetableEvent(_day("2025-11-05"), "Holiday", EventType.HOLIDAY),
+        TimetableEvent(_day("2025-11-09"), "Holiday", EventType.HOLIDAY),
+        TimetableEvent(_day("2025-11-06"), "Holiday", EventType.EXAM),
+        TimetableEvent(None, "Undated", EventType.OTHER),
+    ]
+    merged = merge_intervals(rows)
+    assert [(e.date_iso, e.end_date_iso, e.type) for e in merged] == [
+        ("2025-11-05", "2025-11-06", EventType.HOLIDAY),
+        ("2025-11-06", "2025-11-06", EventType.EXAM),
+        ("2025-11-09", "2025-11-09", EventType.HOLIDAY),
+        (None, None, EventType.OTHER),
+    ]
+
+
+@pytest.mark.parametrize("title, stripped", [
+    ("Wednesday Guru Nanak Holiday", "Guru Nanak Holiday"),
+    ("Thurs. - Mid-Sem Exam", "Mid-Sem Exam"),
+    ("Saturnalia Holiday", "Saturnalia Holiday"),
+    ("Monday", ""),
+])
+def test_strip_leading_weekday(title, stripped):
+    assert strip_leading_weekday(title) == stripped
@@ -0,0 +1,82 @@
+# tests/test_reminders.py
+import time
+from datetime import datetime, timedelta
+
+from app.reminder_engine import Reminder, ReminderEngine, ReminderStore
+from app.reminder_scheduler import ReminderScheduler, reminder_key
+
+
+class FakeGmail:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, to_email, subject, body_text):
+        self.sent.append((to_email, subject))
+
+
+def _scheduler(gmail, **engine_kwargs):
+    sched = ReminderScheduler(gmail)
+    sched.engine = ReminderEngine(sched._send_email, ReminderStore(":memory:"), **engine_kwargs)
+    return sched
+
+
+def test_same_reminder_for_two_students_is_kept_twice():
+    gmail = FakeGmail()
+    sched = _scheduler(gmail, window_seconds=5.0)
+    when = datetime.now() + timedelta(seconds=0.3)
+    reminder = {"when": when, "subject": "Exam: Physics tomorrow", "body": "Room 101"}
+
+    sched.schedule_reminders([dict(reminder, to="alice@college.example"),
+                              dict(reminder, to="bob@college.example")])
+    assert sched.engine.store.count() == 2
+
+    sched.start()
+    deadline = time.time() + 3
+    while len(gmail.sent) < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    sched.shutdown()
+    assert sorted(to for to, _ in gmail.sent) == ["alice@college.example", "bob@college.example"]
+
+
+def test_derived_key_is_stable_and_recipient_insensitive_to_case():
+    when = datetime(2025, 11, 3, 9, 0)
+    a = reminder_key({"when": when, "subject": "s", "to": "Alice@College.example"})
+    b = reminder_key({"when": when, "subject": "s", "to": "alice@college.example"})
+    c = reminder_key({"when": when, "subject": "s", "to": "bob@college.example"})
+    assert a == b != c
+
+
+def test_cancel_and_reschedule_by_key():
+    sent = []
+    engine = ReminderEngine(sent.append, ReminderStore(":memory:"), window_seconds=5.0)
+    now = time.time()
+    engine.schedule([Reminder("gone", now + 0.2, "s", "b"), Reminder("moved", now + 0.2, "s", "b")])
+    engine.start()
+    engine.cancel("gone")
+    engine.schedule([Reminder("moved", now + 0.6, "s2", "b")])
+    time.sleep(1.0)
+    engine.shutdown()
+    assert [(r.key, r.subject) for r in sent] == [("moved", "s2")]
+
+
+def test_pending_count_is_kept_without_scanning_the_table(tmp_path):
+    path = str(tmp_path / "reminders.db")
+    store = ReminderStore(path)
+    statements = []
+    store._conn.set_trace_callback(statements.append)
+    engine = ReminderEngine(lambda r: None, store, window_seconds=5.0)
+    later = time.time() + 3600
+
+    engine.schedule([Reminder(f"k{i}", later, "s", "b") for i in range(5)])
+    # a replaced key, and a key repeated within one batch, are counted once
+    engine.schedule([Reminder("k0", later + 1, "s", "b"), Reminder("new", later, "s", "b"),
+                     Reminder("new", later + 2, "s", "b")])
+    assert store.count() == 6
+    assert engine.cancel("k1") and not engine.cancel("k1")
+    store.remove_dispatched([Reminder("k2", later, "s", "b"), Reminder("k0", later, "s", "b")])  # k0 moved
+    assert store.count() == 4
+    assert engine.stats()["pending_total"] == 4
+    assert not any("SELECT COUNT(*) FROM reminders" == s.strip() for s in statements)
+
+    store.close()
+    assert ReminderStore(path).count() == 4
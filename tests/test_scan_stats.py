@@ -0,0 +1,44 @@
+# tests/test_scan_stats.py
+import app.main as main
+from app.records import AnalysisSource, Category, EmailRecord, ScanResult
+
+
+class FakeGmail:
+    def fetch_messages(self, max_results=40):
+        return [
+            EmailRecord("Exam hall allotment", "Room 4", id="1"),
+            EmailRecord("Exam hall allotment", "Room 4", id="2"),
+            EmailRecord("Internship interview", "Tomorrow 10am", id="3"),
+            EmailRecord("Assignment 3 out", "Due Friday", id="4"),
+            EmailRecord("Placement drive", "Register now", id="5"),
+            EmailRecord("Canteen menu", "Paneer on Friday", id="6"),
+        ]
+
+
+SOURCES = {
+    "1": AnalysisSource.LLM,
+    "2": AnalysisSource.CACHE,
+    "3": AnalysisSource.KEYWORD_ONLY,
+    "4": AnalysisSource.KEYWORD_ONLY,
+    "5": AnalysisSource.ERROR,
+}
+
+
+def fake_analyze(email, budget, pending):
+    source = SOURCES[email.id]
+    category = Category.ERROR if source is AnalysisSource.ERROR else Category.IMPORTANT
+    return ScanResult(email.subject, email.snippet, "analysis", category, source)
+
+
+def test_stats_count_llm_calls_separately_from_cached_and_degraded(monkeypatch):
+    monkeypatch.setattr(main, "get_gmail_client", FakeGmail)
+    monkeypatch.setattr(main, "analyze_email", fake_analyze)
+
+    results, stats = main.scan_and_flag(max_messages=6)
+
+    assert len(results) == 6
+    assert stats["analysis"] == 1
+    assert stats["cached"] == 1
+    assert stats["keyword_only"] == 2
+    assert stats["errors"] == 1
+    assert stats["skipped"] == 1
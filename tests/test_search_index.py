@@ -0,0 +1,75 @@
+# tests/test_search_index.py
+import os
+import sqlite3
+
+from app.agents.email_agent import KEYWORD_ONLY_ANALYSIS
+from app.records import AnalysisSource, Category, EmailRecord, ScanResult
+from app.search_index import EmailSearchIndex
+
+EMAIL = EmailRecord("Midterm exam schedule", "The midterm is on Monday", id="m1", sender="dean@college.example")
+
+
+def _llm_result():
+    return ScanResult(EMAIL.subject, EMAIL.snippet, "IMPORTANT: midterm on Monday", Category.IMPORTANT)
+
+
+def test_degraded_results_do_not_overwrite_llm_analysis():
+    index = EmailSearchIndex(":memory:")
+    assert index.upsert([(EMAIL, _llm_result())]) == 1
+
+    degraded = [
+        ScanResult(EMAIL.subject, EMAIL.snippet, KEYWORD_ONLY_ANALYSIS, Category.POTENTIALLY_IMPORTANT,
+                   AnalysisSource.KEYWORD_ONLY),
+        ScanResult(EMAIL.subject, EMAIL.snippet, "Error analyzing email: timeout", Category.ERROR,
+                   AnalysisSource.ERROR),
+        ScanResult(EMAIL.subject, EMAIL.snippet, "Skipped (no relevant keywords found)", Category.SKIPPED,
+                   AnalysisSource.PREFILTER),
+    ]
+    for result in degraded:
+        assert index.upsert([(EMAIL, result)]) == 0
+
+    [row] = index.search("midterm")
+    assert row["category"] == "IMPORTANT"
+    assert row["analysis"] == "IMPORTANT: midterm on Monday"
+
+
+def test_llm_result_replaces_degraded_one():
+    index = EmailSearchIndex(":memory:")
+    degraded = ScanResult(EMAIL.subject, EMAIL.snippet, KEYWORD_ONLY_ANALYSIS, Category.POTENTIALLY_IMPORTANT,
+                          AnalysisSource.KEYWORD_ONLY)
+    assert index.upsert([(EMAIL, degraded)]) == 1
+    assert index.upsert([(EMAIL, _llm_result())]) == 1
+    assert index.search(categories=["IMPORTANT"])[0]["id"] == "m1"
+
+
+def test_index_without_source_column_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE emails (rowid INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, subject TEXT NOT NULL,"
+        " snippet TEXT NOT NULL, sender TEXT NOT NULL DEFAULT '', date REAL NOT NULL DEFAULT 0,"
+        " category TEXT NOT NULL, analysis TEXT NOT NULL DEFAULT '', indexed_at REAL NOT NULL);"
+        "INSERT INTO emails (id, subject, snippet, category, analysis, indexed_at)"
+        " VALUES ('m1', 'Midterm exam schedule', 'The midterm is on Monday', 'IMPORTANT', 'from the LLM', 0);"
+    )
+    conn.commit()
+    conn.close()
+
+    index = EmailSearchIndex(path)
+    degraded = ScanResult(EMAIL.subject, EMAIL.snippet, KEYWORD_ONLY_ANALYSIS, Category.POTENTIALLY_IMPORTANT,
+                          AnalysisSource.KEYWORD_ONLY)
+    assert index.upsert([(EMAIL, degraded)]) == 0
+    index.close()
+
+
+def test_offline_harness_keeps_index_and_feeds_out_of_the_tree():
+    from loadtest.fakes import FakeChatGroq, install_offline_backends
+
+    import app.ics_feed as ics_feed
+    import app.search_index as search_index
+
+    token_path = install_offline_backends("http://127.0.0.1:9", FakeChatGroq())
+    scratch = os.path.dirname(token_path)
+    assert search_index.get_index().path.startswith(scratch)
+    assert search_index.INDEX_PATH.startswith(scratch)
+    assert ics_feed.feed_store.directory.startswith(scratch)
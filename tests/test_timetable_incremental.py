@@ -0,0 +1,75 @@
+# tests/test_timetable_incremental.py
+import fitz
+import pytest
+
+from app import timetable_parser_pdf as tp
+from tests.conftest import build_pdf
+
+
+def _xobject_pdf(lines):
+    """One page whose text lives entirely inside a Form XObject."""
+    src = fitz.open("pdf", build_pdf(lines))
+    doc = fitz.open()
+    page = doc.new_page()
+    page.show_pdf_page(page.rect, src, 0)
+    data = doc.tobytes()
+    doc.close()
+    src.close()
+    return data
+
+
+def _full_parse(data):
+    return tp.parse_timetable_text(tp.extract_text_from_pdf_bytes(data))
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    tp._page_lines.clear()
+    tp._page_entries.clear()
+    tp._doc_versions.clear()
+    yield
+
+
+def test_xobject_pages_with_different_text_do_not_share_cache():
+    first = _xobject_pdf(["Mid-Sem Exam - Physics 19-Sep-2025"])
+    second = _xobject_pdf(["Mid-Sem Exam - Physics 25-Sep-2025"])
+
+    tp.parse_timetable_pdf_incremental(first)
+    parsed, report = tp.parse_timetable_pdf_incremental(second)
+
+    assert report.pages_reparsed == (1,)
+    assert parsed == _full_parse(second)
+    assert [e.date_iso for e in parsed["exams"]] == ["2025-09-25"]
+
+
+def test_incremental_matches_full_parse_for_revised_document():
+    pages = [[f"{d:02d}-Nov-2025 Friday Mid-Sem Exam - Subject {p}-{d}" for d in range(1, 20)]
+             for p in range(4)]
+
+    original = build_pdf(*pages, fontsize=9)
+    revised_pages = [list(p) for p in pages]
+    revised_pages[2][3] = "Diwali Break 20-Oct-2025 to 26-Oct-2025"
+    revised = build_pdf(*revised_pages, fontsize=9)
+
+    tp.parse_timetable_pdf_incremental(original, doc_key="tt")
+    parsed, report = tp.parse_timetable_pdf_incremental(revised, doc_key="tt")
+
+    assert parsed == _full_parse(revised)
+    assert report.pages_changed == (3,)
+    assert 1 not in report.pages_reparsed
+
+
+def test_fingerprint_ignores_object_renumbering():
+    def build(prefix_pages):
+        doc = fitz.open()
+        for _ in range(prefix_pages):
+            doc.new_page().insert_text((50, 60), "Notice: revised schedule", fontsize=9)
+        doc.new_page().insert_text((50, 60), "05-Dec-2025 Friday End-Sem Exam - Networks", fontsize=9)
+        data = doc.tobytes()
+        doc.close()
+        return fitz.open("pdf", data)
+
+    a, b = build(0), build(1)
+    # the inserted page shifts every object number of the unchanged one
+    assert a[0].xref != b[1].xref
+    assert tp.page_fingerprint(a[0]) == tp.page_fingerprint(b[1])
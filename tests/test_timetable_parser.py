@@ -0,0 +1,41 @@
+# tests/test_timetable_parser.py
+import io
+
+from app.records import EventType
+from app.timetable_parser import parse_pdf_timetable
+from app.timetable_parser_pdf import parse_timetable_text
+
+
+def test_adjacent_days_merge_despite_the_weekday_column(capsys, make_pdf):
+    events = parse_pdf_timetable(io.BytesIO(make_pdf([
+        "Date Day Event",
+        "05-Nov-2025 Wednesday Guru Nanak Holiday",
+        "06-Nov-2025 Thursday Guru Nanak Holiday",
+        "07-Nov-2025 Fri Guru Nanak Holiday",
+        "19-Nov-2025 Wednesday Mid-Sem Exam - Mathematics",
+    ])))
+
+    holidays = [e for e in events if e.type is EventType.HOLIDAY]
+    assert [(h.title, h.date_iso, h.end_date_iso) for h in holidays] == [
+        ("Guru Nanak Holiday", "2025-11-05", "2025-11-07"),
+    ]
+    [exam] = [e for e in events if e.type is EventType.EXAM]
+    assert exam.title == "Mid-Sem Exam - Mathematics"
+
+
+def test_titles_that_merely_start_like_a_weekday_are_kept(capsys, make_pdf):
+    [event] = parse_pdf_timetable(io.BytesIO(make_pdf(["10-Nov-2025 Monday Saturnalia Holiday"])))
+    assert event.title == "Saturnalia Holiday"
+
+
+def test_pymupdf_text_parser_merges_adjacent_weekday_rows():
+    parsed = parse_timetable_text("\n".join([
+        "05-Nov-2025 Wednesday Guru Nanak Holiday",
+        "06-Nov-2025 Thursday Guru Nanak Holiday",
+        "19-Nov-2025 Wed Mid-Sem Exam - Mathematics",
+    ]))
+
+    assert [(h.title, h.date_iso, h.end_date_iso) for h in parsed["holidays"]] == [
+        ("Guru Nanak Holiday", "2025-11-05", "2025-11-06"),
+    ]
+    assert [e.title for e in parsed["exams"]] == ["Mid-Sem Exam - Mathematics"]
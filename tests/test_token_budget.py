@@ -0,0 +1,59 @@
+# tests/test_token_budget.py
+import pytest
+
+from app.agents import email_agent
+from app.agents.token_budget import ClassificationCache, DailyTokenLedger, ScanBudget
+from app.records import AnalysisSource, EmailRecord
+from loadtest.fakes import FakeChatGroq
+
+
+class RecordingLLM(FakeChatGroq):
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+
+    def invoke(self, prompt_text):
+        self.prompts.append(prompt_text)
+        return super().invoke(prompt_text)
+
+
+@pytest.fixture(autouse=True)
+def offline_llm(monkeypatch):
+    fake = RecordingLLM()
+    monkeypatch.setattr(email_agent, "llm", fake)
+    monkeypatch.setattr(email_agent, "classification_cache", ClassificationCache(0))
+    return fake
+
+
+def _inbox(n):
+    return [EmailRecord(f"Exam schedule update #{i}", "The mid-semester exam for your section has moved. " * 4,
+                        id=str(i)) for i in range(n)]
+
+
+def _scan(emails, limit):
+    budget = ScanBudget(limit=limit, ledger=DailyTokenLedger(10 ** 9))
+    results = []
+    for pending, email in zip(range(len(emails), 0, -1), emails):
+        results.append(email_agent.analyze_email(email, budget, pending))
+    return [r.source for r in results], budget
+
+
+def test_newest_emails_are_fully_classified_when_the_budget_is_enough(offline_llm):
+    sources, budget = _scan(_inbox(10), limit=10 * 400)
+    assert sources == [AnalysisSource.LLM] * 10
+    assert budget.stats()["llm_degraded"] == 0
+    # nothing was trimmed: every prompt carried the whole subject and snippet
+    assert all("mid-semester exam for your section has moved" in p for p in offline_llm.prompts)
+
+
+@pytest.mark.parametrize("count, limit", [(10, 600), (150, 20_000)])
+def test_only_the_tail_is_degraded_once_the_budget_runs_out(count, limit):
+    sources, budget = _scan(_inbox(count), limit)
+    classified = sources.count(AnalysisSource.LLM)
+    assert classified > 0
+    # the newest `classified` emails went to the LLM, everything after fell back
+    assert sources == [AnalysisSource.LLM] * classified + [AnalysisSource.KEYWORD_ONLY] * (count - classified)
+    # the budget was actually used up before anything degraded
+    overhead = email_agent.PROMPT_OVERHEAD_TOKENS + email_agent.LLM_MAX_OUTPUT_TOKENS
+    if classified < count:
+        assert limit - budget.spent < overhead + email_agent.EMAIL_TOKEN_FLOOR * 2
@@ -0,0 +1,41 @@
+# tests/test_upload_changes.py
+import io
+
+
+def _upload(client, data, token=None):
+    form = {"file": (io.BytesIO(data), "timetable.pdf")}
+    if token:
+        form["doc_token"] = token
+    return client.post("/api/upload_timetable", data=form)
+
+
+def test_change_report_is_scoped_to_the_uploading_client(client, make_pdf):
+    alice = make_pdf(["19-Sep-2025 Friday Mid-Sem Exam - Physics"])
+    bob = make_pdf(["03-Oct-2025 Friday Mid-Sem Exam - Chemistry"])
+
+    _upload(client, alice, token="alice-token-0123456789")
+    resp = _upload(client, bob, token="bob-token-0123456789ab").get_json()
+
+    # bob's first upload: nothing of alice's file may show up as removed
+    assert resp["changes"]["entries_removed"] == []
+    assert [e["date"] for e in resp["changes"]["entries_added"]] == ["2025-10-03"]
+
+    again = _upload(client, alice, token="alice-token-0123456789").get_json()
+    assert again["changes"]["entries_added"] == []
+    assert again["changes"]["entries_removed"] == []
+
+
+def test_short_doc_token_is_rejected_and_no_token_means_no_report(client, make_pdf):
+    data = make_pdf(["19-Sep-2025 Friday Mid-Sem Exam - Physics"])
+    assert _upload(client, data, token="short").status_code == 400
+    resp = _upload(client, data).get_json()
+    assert "changes" not in resp
+
+
+def test_events_and_changes_come_from_one_parse(client, make_pdf):
+    data = make_pdf(["05-Nov-2025 Wednesday Guru Nanak Holiday", "06-Nov-2025 Thursday Guru Nanak Holiday"])
+    resp = _upload(client, data, token="alice-token-0123456789").get_json()
+
+    expected = [{"event": "Guru Nanak Holiday", "date": "2025-11-05", "end_date": "2025-11-06"}]
+    assert [{k: e[k] for k in ("event", "date", "end_date")} for e in resp["events"]] == expected
+    assert [{k: e[k] for k in ("event", "date", "end_date")} for e in resp["changes"]["entries_added"]] == expected